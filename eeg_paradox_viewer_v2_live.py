@@ -4,46 +4,361 @@ from PyQt5.QtWidgets import (
     QWidget, QSlider, QHBoxLayout, QCheckBox, QSpinBox, QMessageBox, QScrollArea,
     QDialog, QRadioButton, QComboBox, QListWidget, QDialogButtonBox, QColorDialog,
     QInputDialog, QListWidgetItem, QTextEdit, QGroupBox, QGridLayout, QLineEdit,
-    QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QSplitter, QFrame, QStatusBar
+    QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QSplitter, QFrame, QStatusBar,
+    QStyledItemDelegate, QStyleOptionButton, QStyle, QDockWidget
+)
+from PyQt5.QtGui import (
+    QPixmap, QImage, QKeySequence, QPainter, QPen, QColor, QFont, QBrush, QGuiApplication, QFontMetrics
+)
+from PyQt5.QtCore import (
+    Qt, QSettings, QTimer, QPoint, QRect, QDateTime, QObject, QRunnable, QThreadPool, pyqtSignal,
+    QThread, QMetaObject, pyqtSlot,
+    QEvent, QSize
 )
-from PyQt5.QtGui import QPixmap, QImage, QKeySequence, QPainter, QPen, QColor, QFont, QBrush
-from PyQt5.QtCore import Qt, QSettings, QTimer, QPoint, QRect, QDateTime
 import fitz  # PyMuPDF
 import cv2
 import numpy as np
 import os
-import mss
-import pygetwindow as gw
+import importlib.util
 import json
+import re
 from datetime import datetime
 import math
-
-# Try to import screen capture - use fallback if not available
-try:
-    from PIL import ImageGrab
+import functools
+import itertools
+import time
+import threading
+import bisect
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+
+# Screen capture goes through mss; without it capture features are disabled.
+# Only its presence is checked here, the import waits until a capture is made.
+if importlib.util.find_spec("mss") is not None:
     SCREEN_CAPTURE_AVAILABLE = True
-    # Although mss is preferred, we keep track that PIL is an option
-    SCREEN_CAPTURE_METHOD = "pil" 
-except ImportError:
+    SCREEN_CAPTURE_METHOD = "mss"
+else:
     SCREEN_CAPTURE_AVAILABLE = False
     SCREEN_CAPTURE_METHOD = "none"
-
-# We will prioritize mss if available, as it's better for region capture
+    print("Screen capture not available. Please install 'mss'.")
+
+_mss_module = None
+
+def _mss():
+    """Import and configure mss on first use; it loads its ctypes bindings on import."""
+    global _mss_module
+    if _mss_module is None:
+        import mss
+        if sys.platform == "win32":
+            import mss.windows
+            if hasattr(mss.windows, "CAPTUREBLT"):
+                # Older mss releases blend layered windows into every grab; the EEG
+                # displays we capture don't need it and it slows BitBlt down.
+                mss.windows.CAPTUREBLT = 0
+        _mss_module = mss
+    return _mss_module
+
+# orjson is optional; it serialises large exports far faster than json.
 try:
-    import mss
-    SCREEN_CAPTURE_METHOD = "mss"
+    import orjson
 except ImportError:
-    # If mss fails, we rely on the PIL check above
-    if SCREEN_CAPTURE_METHOD == "pil":
-        print("mss not found, falling back to PIL. For multi-monitor support, please install mss.")
-    else:
-        print("Screen capture not available. Please install 'mss' or 'Pillow'.")
+    orjson = None
+
+# Creating an mss instance allocates OS capture resources, and instances
+# must not be shared between threads, so each thread keeps its own.
+_SCT_LOCAL = threading.local()
+
+def get_sct():
+    """Return the calling thread's persistent mss instance."""
+    sct = getattr(_SCT_LOCAL, "sct", None)
+    if sct is None:
+        sct = _SCT_LOCAL.sct = _mss().mss()
+    return sct
+
+def close_sct():
+    """Release the calling thread's mss instance, if it has one."""
+    sct = getattr(_SCT_LOCAL, "sct", None)
+    if sct is not None:
+        _SCT_LOCAL.sct = None
+        try:
+            sct.close()
+        except Exception as e:
+            print(f"Error closing screen capture: {e}")
 
+# Annotation types that carry a numeric value
+MEASUREMENT_TYPES = ("Amplitude", "Frequency", "Duration", "Latency")
+# Annotation types drawn as event markers
+EVENT_TYPES = ("Seizure", "Artifact", "Normal", "Abnormal")
+
+# Exports run their filters through OpenCL (cv2.UMat) when OpenCV has a device
+try:
+    OPENCL_AVAILABLE = cv2.ocl.haveOpenCL()
+    if OPENCL_AVAILABLE:
+        cv2.ocl.setUseOpenCL(True)
+except (AttributeError, cv2.error):
+    OPENCL_AVAILABLE = False
+
+# PDF pages are rendered only as sharp as the zoom needs, in coarse steps.
+# Image coordinates always refer to the page at PDF_MAX_DPI.
+PDF_MAX_DPI = 300
+PDF_MIN_DPI = 72
+PDF_DPI_STEP = 36
+PDF_PAGE_CACHE_SIZE = 8  # rendered (page, dpi) images kept
+# PyMuPDF shares one MuPDF context between all documents and isn't
+# thread-safe, so every call into it must hold this lock
+_PDF_LOCK = threading.Lock()
+
+# Filtered images kept per (image, filter settings, size), so toggling a
+# filter or zooming back and forth doesn't recompute them
+PROCESSED_CACHE_SIZE = 3
+
+def pdf_dpi_for_zoom(scale_percent):
+    """Lowest DPI step that still covers the given zoom of a PDF_MAX_DPI page."""
+    dpi = math.ceil(PDF_MAX_DPI * scale_percent / 100 / PDF_DPI_STEP) * PDF_DPI_STEP
+    return max(PDF_MIN_DPI, min(PDF_MAX_DPI, dpi))
+
+def open_pdf(path):
+    """Open a PDF, returning the fitz document and its page count."""
+    with _PDF_LOCK:
+        doc = fitz.open(path)
+        return doc, len(doc)
+
+def close_pdf(doc):
+    with _PDF_LOCK:
+        doc.close()
+
+def render_pdf_page(doc, page_number, dpi):
+    """Rasterise one page of a fitz document as an RGB array."""
+    with _PDF_LOCK:
+        if doc.is_closed:
+            raise ValueError("document closed")
+        pix = doc.load_page(page_number).get_pixmap(dpi=dpi)
+        image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        # PyMuPDF samples are already RGB (RGBA only if alpha was requested).
+        # The copy owns its pixels, so the pixmap is freed under the lock too.
+        image = image[..., :3].copy()
+        del pix
+    return image
+
+# Overlay/annotation ids: process start time plus a counter, unique per session
+_ID_BASE = datetime.now().strftime("%Y%m%d_%H%M%S_")
+_ID_COUNTER = itertools.count()
+
+def _make_id():
+    return f"{_ID_BASE}{next(_ID_COUNTER):06d}"
+
+# Window titles are cached briefly so reopening the source dialog doesn't
+# query every OS window again.
+WINDOW_LIST_TTL = 2.0  # seconds
+_WINDOW_LIST_CACHE = {"ts": 0.0, "items": []}
+
+def _enum_visible_titles():
+    """Return visible, titled top-level window titles straight from EnumWindows (Windows only)."""
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    titles = []
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, _):
+        if user32.IsWindowVisible(hwnd):
+            length = user32.GetWindowTextLengthW(hwnd)
+            if length:
+                buf = ctypes.create_unicode_buffer(length + 1)
+                user32.GetWindowTextW(hwnd, buf, length + 1)
+                if buf.value:
+                    titles.append(buf.value)
+        return True
+
+    user32.EnumWindows(callback, 0)
+    return titles
+
+def _list_window_titles():
+    """Return the titles of all visible, titled top-level windows."""
+    if sys.platform == "win32":
+        try:
+            return _enum_visible_titles()
+        except (AttributeError, OSError) as e:
+            print(f"EnumWindows failed, falling back to pygetwindow: {e}")
+    import pygetwindow as gw
+    titles = []
+    for window in gw.getWindowsWithTitle(''):
+        try:
+            if not window.title:
+                continue
+            # Not every pygetwindow backend implements isVisible
+            if hasattr(window, 'isVisible') and not window.isVisible():
+                continue
+            titles.append(window.title)
+        except Exception:
+            # Window might have been closed while iterating
+            continue
+    return titles
+
+def get_window_titles():
+    """Return visible window titles, reusing a recent listing if available."""
+    now = time.monotonic()
+    if now - _WINDOW_LIST_CACHE["ts"] >= WINDOW_LIST_TTL:
+        _WINDOW_LIST_CACHE["items"] = _list_window_titles()
+        _WINDOW_LIST_CACHE["ts"] = now
+    return _WINDOW_LIST_CACHE["items"]
+
+def _read_image_rgb(path):
+    """Load an image file as RGB, the viewer's working format."""
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+_filter_pool_executor = None
+
+def _filter_pool():
+    """Return the thread pool that runs independent OpenCV filter steps side by side.
+
+    OpenCV releases the GIL while it works, so planes run on these threads in
+    parallel. The pool is created on first use and kept for the session.
+    """
+    global _filter_pool_executor
+    if _filter_pool_executor is None:
+        _filter_pool_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="filter")
+    return _filter_pool_executor
+
+def _json_dumps(obj, indent=True):
+    """Serialise obj to UTF-8 JSON bytes, indented by two spaces or compact.
+
+    The output is the same with or without orjson, so exported files don't
+    depend on which optional packages are installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _json_loads(data):
+    """Parse JSON text or bytes, with orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class _WorkerSignals(QObject):
+    """Signals for QRunnable tasks, which can't emit signals themselves."""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class _JsonWriteTask(QRunnable):
+    """Serialises and writes a JSON file on a thread-pool thread."""
+    def __init__(self, file_path, obj):
+        super().__init__()
+        self.file_path = file_path
+        self.obj = obj
+        self.signals = _WorkerSignals()
+
+    def run(self):
+        try:
+            data = _json_dumps(self.obj)
+            with open(self.file_path, 'wb') as f:
+                f.write(data)
+        except Exception as e:
+            print(f"Error writing {self.file_path}: {e}")
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(self.file_path)
+
+class _PdfRenderTask(QRunnable):
+    """Renders a PDF page on a thread-pool thread."""
+    def __init__(self, doc, page_number, dpi):
+        super().__init__()
+        self.doc = doc
+        self.page_number = page_number
+        self.dpi = dpi
+        self.signals = _WorkerSignals()
+        # Set once image is ready (or the render failed), for callers that
+        # need the page before the finished signal reaches them
+        self.done = threading.Event()
+        self.image = None
+
+    def run(self):
+        try:
+            self.image = render_pdf_page(self.doc, self.page_number, self.dpi)
+        except Exception as e:
+            self.done.set()
+            self.signals.failed.emit(str(e))
+        else:
+            self.done.set()
+            self.signals.finished.emit(self.image)
+
+class CaptureWorker(QObject):
+    """Grabs frames for live capture on its own thread and emits them as BGRA arrays."""
+    frame_ready = pyqtSignal(object)
+
+    def __init__(self, capture_area, interval_ms):
+        super().__init__()
+        self.capture_area = capture_area
+        self.interval_ms = interval_ms
+        # Set while a frame is waiting for the GUI, so slow redraws drop
+        # frames instead of queueing them up
+        self.busy = False
+        self._timer = None
+        self._sct = None
+        # Last frame emitted, to recognise grabs where nothing on screen changed
+        self._last_frame = None
+
+    @pyqtSlot()
+    def start(self):
+        # Created here so the timer lives in, and fires on, the worker thread.
+        # The mss instance is held directly: Python's thread-local state isn't
+        # kept between slot calls on a QThread, so get_sct() would rebuild it.
+        self._sct = _mss().mss()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.grab)
+        self._timer.start(self.interval_ms)
+
+    @pyqtSlot()
+    def stop(self):
+        if self._timer:
+            self._timer.stop()
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception as e:
+                print(f"Error closing screen capture: {e}")
+            self._sct = None
+        self._last_frame = None
+
+    @pyqtSlot(int)
+    def set_interval(self, interval_ms):
+        self.interval_ms = interval_ms
+        if self._timer:
+            self._timer.setInterval(interval_ms)
+
+    def grab(self):
+        if self.busy or self._sct is None:
+            return
+        try:
+            frame = np.asarray(self._sct.grab(self.capture_area))
+        except Exception as e:
+            print(f"Live capture error: {e}")
+            return
+        # A paused or static display gives identical frames; skipping them
+        # here spares the GUI thread the whole filter and redraw pipeline
+        if self._last_frame is not None and np.array_equal(frame, self._last_frame):
+            return
+        self._last_frame = frame
+        self.busy = True
+        self.frame_ready.emit(frame)
+
+@functools.lru_cache(maxsize=1)
 def get_screen_refresh_rate():
-    """Get the primary screen refresh rate in Hz."""
-    # For packaging compatibility, we'll use a default value
+    """Get the primary screen refresh rate in Hz, queried once."""
+    try:
+        rate = QGuiApplication.primaryScreen().refreshRate()
+    except Exception as e:
+        print(f"Could not query screen refresh rate: {e}")
+        rate = 0
     # Most modern monitors are 60Hz, which is a good default
-    return 60
+    return int(round(rate)) if rate > 0 else 60
 
 class CaptureSourceDialog(QDialog):
     def __init__(self, parent=None):
@@ -57,12 +372,12 @@ class CaptureSourceDialog(QDialog):
         self.screen_radio.setChecked(True)
         self.monitor_combo = QComboBox()
         try:
-            with mss.mss() as sct:
-                if len(sct.monitors) > 1:
-                    for i, monitor in enumerate(sct.monitors[1:], 1):
-                         self.monitor_combo.addItem(f"Screen {i}: {monitor['width']}x{monitor['height']}", i)
-                else:
-                    self.monitor_combo.addItem("Screen 1 (Primary)", 1) # Should not happen, but a fallback
+            sct = get_sct()
+            if len(sct.monitors) > 1:
+                for i, monitor in enumerate(sct.monitors[1:], 1):
+                     self.monitor_combo.addItem(f"Screen {i}: {monitor['width']}x{monitor['height']}", i)
+            else:
+                self.monitor_combo.addItem("Screen 1 (Primary)", 1) # Should not happen, but a fallback
         except Exception as e:
             print(f"Could not list monitors via mss: {e}")
             self.monitor_combo.addItem("Screen 1 (Default)", 1)
@@ -89,21 +404,11 @@ class CaptureSourceDialog(QDialog):
 
     def populate_window_list(self):
         self.window_list.clear()
-        app_title = self.parent().windowTitle()
+        excluded = {self.parent().windowTitle()}
         try:
-            for window in gw.getWindowsWithTitle(''):
-                try:
-                    if window.title and window.title != app_title:
-                        # Check if window is visible without using isVisible
-                        if hasattr(window, 'isVisible'):
-                            if window.isVisible():
-                                self.window_list.addItem(window.title)
-                        else:
-                            # If isVisible not available, just add the window
-                            self.window_list.addItem(window.title)
-                except Exception:
-                    # Window might have been closed while iterating
-                    continue
+            for title in get_window_titles():
+                if title not in excluded:
+                    self.window_list.addItem(title)
         except Exception as e:
             print(f"Could not get window list: {e}")
             self.window_list.addItem("Error: Could not list windows.")
@@ -264,6 +569,50 @@ class AnnotationDialog(QDialog):
         
         return data
 
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in every cell of a column and reports clicks by row."""
+    clicked = pyqtSignal(int)
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self._pressed = None
+
+    def _button_option(self, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = self.text
+        button.state = QStyle.State_Enabled
+        if self._pressed == (index.row(), index.column()):
+            button.state |= QStyle.State_Sunken
+        else:
+            button.state |= QStyle.State_Raised
+        return button
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, self._button_option(option, index), painter, widget)
+
+    def sizeHint(self, option, index):
+        width = option.fontMetrics.horizontalAdvance(self.text) + 24
+        return super().sizeHint(option, index).expandedTo(QSize(width, 24))
+
+    def createEditor(self, parent, option, index):
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self._pressed = (index.row(), index.column())
+            return True
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            was_pressed = self._pressed == (index.row(), index.column())
+            self._pressed = None
+            if was_pressed and option.rect.contains(event.pos()):
+                self.clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
 class AnnotationsPanelDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -299,6 +648,8 @@ class AnnotationsPanelDialog(QDialog):
         button_layout.addWidget(self.close_button)
         layout.addLayout(button_layout)
         
+        # Deletes in quick succession share one table rebuild and redraw
+        self._refresh_pending = False
         self.refresh_data()
     
     def create_annotations_tab(self):
@@ -318,6 +669,11 @@ class AnnotationsPanelDialog(QDialog):
         header.setSectionResizeMode(4, QHeaderView.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
+
+        # One painted Delete button per row instead of a widget and connection each
+        self.delete_delegate = ButtonDelegate("Delete", self.annotations_table)
+        self.delete_delegate.clicked.connect(self.delete_annotation)
+        self.annotations_table.setItemDelegateForColumn(6, self.delete_delegate)
         
         self.tab_widget.addTab(self.annotations_table, "Annotations")
     
@@ -338,91 +694,92 @@ class AnnotationsPanelDialog(QDialog):
         if not hasattr(self.parent, 'professional_annotations'):
             return
         
-        # Clear table
-        self.annotations_table.setRowCount(0)
-        
-        # Populate table
-        for i, annotation in enumerate(self.parent.professional_annotations):
-            self.annotations_table.insertRow(i)
-            
-            # Type
-            self.annotations_table.setItem(i, 0, QTableWidgetItem(annotation.type))
-            
-            # Time
-            time_str = annotation.data.get("timestamp", "Unknown")
-            self.annotations_table.setItem(i, 1, QTableWidgetItem(time_str))
-            
-            # Position
-            if annotation.position:
-                pos_str = f"({annotation.position.x()}, {annotation.position.y()})"
-            else:
-                pos_str = "N/A"
-            self.annotations_table.setItem(i, 2, QTableWidgetItem(pos_str))
-            
-            # Value
-            value = annotation.data.get("value", "")
-            unit = annotation.data.get("unit", "")
-            value_str = f"{value} {unit}" if value else ""
-            self.annotations_table.setItem(i, 3, QTableWidgetItem(value_str))
-            
-            # Description
-            desc = annotation.data.get("description", "")
-            self.annotations_table.setItem(i, 4, QTableWidgetItem(desc))
-            
-            # Channel
-            channel = annotation.data.get("channel", "")
-            self.annotations_table.setItem(i, 5, QTableWidgetItem(channel))
-            
-            # Actions
-            delete_button = QPushButton("Delete")
-            delete_button.clicked.connect(lambda checked, row=i: self.delete_annotation(row))
-            self.annotations_table.setCellWidget(i, 6, delete_button)
+        annotations = self.parent.professional_annotations
+        table = self.annotations_table
+
+        # Populate the table in one pass with repaints and signals suspended,
+        # so Qt lays it out once instead of once per row.
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        try:
+            table.setRowCount(len(annotations))
+            for i, annotation in enumerate(annotations):
+                # Type
+                table.setItem(i, 0, QTableWidgetItem(annotation.type))
+                
+                # Time
+                time_str = annotation.data.get("timestamp", "Unknown")
+                table.setItem(i, 1, QTableWidgetItem(time_str))
+                
+                # Position
+                if annotation.position:
+                    pos_str = f"({annotation.position.x()}, {annotation.position.y()})"
+                else:
+                    pos_str = "N/A"
+                table.setItem(i, 2, QTableWidgetItem(pos_str))
+                
+                # Value
+                value = annotation.data.get("value", "")
+                unit = annotation.data.get("unit", "")
+                value_str = f"{value} {unit}" if value else ""
+                table.setItem(i, 3, QTableWidgetItem(value_str))
+                
+                # Description
+                desc = annotation.data.get("description", "")
+                table.setItem(i, 4, QTableWidgetItem(desc))
+                
+                # Channel
+                channel = annotation.data.get("channel", "")
+                table.setItem(i, 5, QTableWidgetItem(channel))
+                
+                # Actions column is painted by delete_delegate
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            table.viewport().update()
         
         # Update statistics
         self.update_statistics()
     
+    def _schedule_refresh(self):
+        """Refresh the table and main view once, shortly after the last change."""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(50, self._do_refresh)
+
+    def _do_refresh(self):
+        self._refresh_pending = False
+        self.refresh_data()
+        self.parent.update_zoom()
+
     def delete_annotation(self, row):
         """Delete an annotation."""
         if row < len(self.parent.professional_annotations):
             del self.parent.professional_annotations[row]
-            self.refresh_data()
-            self.parent.update_zoom()
+            # Drop the row now so later clicks map to the right annotation
+            self.annotations_table.removeRow(row)
+            self._schedule_refresh()
     
     def update_statistics(self):
         """Update the statistics display."""
         if not hasattr(self.parent, 'professional_annotations'):
             return
         
+        # The store keeps counts and measurement stats up to date as it changes
         annotations = self.parent.professional_annotations
         
-        # Count by type
-        type_counts = {}
-        measurement_values = []
-        
-        for annotation in annotations:
-            annotation_type = annotation.type
-            type_counts[annotation_type] = type_counts.get(annotation_type, 0) + 1
-            
-            # Collect measurement values
-            if annotation_type in ["Amplitude", "Frequency", "Duration", "Latency"]:
-                try:
-                    value = float(annotation.data.get("value", 0))
-                    measurement_values.append(value)
-                except ValueError:
-                    pass
-        
         # Generate statistics text
         stats_text = f"Total Annotations: {len(annotations)}\n\n"
         stats_text += "By Type:\n"
-        for annotation_type, count in type_counts.items():
+        for annotation_type, count in annotations.type_counts.items():
             stats_text += f"  {annotation_type}: {count}\n"
         
-        if measurement_values:
+        if annotations.measurement_count:
             stats_text += f"\nMeasurement Statistics:\n"
-            stats_text += f"  Count: {len(measurement_values)}\n"
-            stats_text += f"  Average: {sum(measurement_values)/len(measurement_values):.2f}\n"
-            stats_text += f"  Min: {min(measurement_values):.2f}\n"
-            stats_text += f"  Max: {max(measurement_values):.2f}\n"
+            stats_text += f"  Count: {annotations.measurement_count}\n"
+            stats_text += f"  Average: {annotations.measurement_mean:.2f}\n"
+            stats_text += f"  Min: {annotations.measurement_min:.2f}\n"
+            stats_text += f"  Max: {annotations.measurement_max:.2f}\n"
         
         self.stats_text.setPlainText(stats_text)
     
@@ -435,25 +792,15 @@ class AnnotationsPanelDialog(QDialog):
             self, "Export Annotations", "eeg_annotations.json", "JSON Files (*.json)"
         )
         if file_path:
-            # Convert annotations to serializable format
-            export_data = []
-            for annotation in self.parent.professional_annotations:
-                annotation_data = {
-                    "type": annotation.type,
-                    "id": annotation.id,
-                    "data": annotation.data
-                }
-                if annotation.position:
-                    annotation_data["position"] = {
-                        "x": annotation.position.x(),
-                        "y": annotation.position.y()
-                    }
-                export_data.append(annotation_data)
-            
-            with open(file_path, 'w') as f:
-                json.dump(export_data, f, indent=2)
-            
-            QMessageBox.information(self, "Export", f"Annotations exported to {file_path}")
+            export_data = [annotation.to_dict() for annotation in self.parent.professional_annotations]
+
+            # Serialise and write off the UI thread; keep a reference until it runs
+            self._export_task = _JsonWriteTask(file_path, export_data)
+            self._export_task.signals.finished.connect(
+                lambda path: QMessageBox.information(self, "Export", f"Annotations exported to {path}"))
+            self._export_task.signals.failed.connect(
+                lambda error: QMessageBox.warning(self, "Export Failed", f"Could not export annotations: {error}"))
+            QThreadPool.globalInstance().start(self._export_task)
     
     def clear_annotations(self):
         """Clear all annotations."""
@@ -464,8 +811,8 @@ class AnnotationsPanelDialog(QDialog):
         )
         if reply == QMessageBox.Yes:
             self.parent.professional_annotations.clear()
-            self.refresh_data()
-            self.parent.update_zoom()
+            self.annotations_table.setRowCount(0)
+            self._schedule_refresh()
 
 class MeasurementTool:
     def __init__(self):
@@ -495,16 +842,71 @@ class MeasurementTool:
         else:
             return f"{self.get_calibrated_value():.2f} {self.calibration_unit}"
 
+@functools.lru_cache(maxsize=64)
+def _arial(points):
+    """Shared overlay label font for a point size."""
+    return QFont("Arial", max(1, points))
+
 class AnalysisOverlay:
     """Base class for all analysis overlays."""
     def __init__(self, overlay_type, data=None):
-        self.id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        self.id = _make_id()
         self.type = overlay_type
         self.data = data if data is not None else {}
-
-    def draw(self, painter, zoom_factor):
+        # Scaled geometry, font and label text for the last zoom drawn at
+        self._cache = {'zoom': None}
+        # Image-space geometry as (x1, y1, x2, y2); once the overlay is stored
+        # this is a row view into its OverlayStore's coordinate buffer.
+        self._xy = np.zeros(4, dtype=np.int32)
+        self._store = None
+        self._row = None
+
+    def invalidate(self):
+        """Drop cached drawing state; call after editing the overlay's data."""
+        self._cache['zoom'] = None
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        # Parse the colour and build the pens/brushes once, not on every paint
+        self._color = value
+        self._qcolor = QColor(value) if value else QColor()
+        self._fill = QColor(self._qcolor)
+        self._fill.setAlpha(32)  # Semi-transparent fill
+        self._pen = QPen(self._qcolor, 2)
+        self._dash_pen = QPen(self._qcolor, 2, Qt.DashLine)
+        self._text_pen = QPen(self._qcolor, 1)
+
+    def _point(self, offset):
+        return QPoint(int(self._xy[offset]), int(self._xy[offset + 1]))
+
+    def _set_point(self, offset, point):
+        self._xy[offset:offset + 2] = (point.x(), point.y())
+        self.invalidate()
+        if self._store is not None:
+            self._store.invalidate()
+
+    def _scaled(self, zoom_factor, scaled):
+        """Scale coordinates from original image space to display space, as ints."""
+        if scaled is None:
+            scaled = (self._xy * zoom_factor).astype(np.int32)
+        return scaled.tolist()
+
+    def draw(self, painter, zoom_factor, scaled=None):
         raise NotImplementedError
 
+    @staticmethod
+    def _label_rect(cache):
+        """Display-space rect of the cached label, drawn with its baseline at 'mid'."""
+        metrics = QFontMetrics(cache['font'])
+        # Glyphs can overhang the reported bounds a little, more so when large
+        pad = 2 + metrics.height() // 8
+        rect = metrics.boundingRect(cache['text'])
+        return rect.translated(*cache['mid']).adjusted(-pad, -pad, pad, pad)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -514,14 +916,8 @@ class AnalysisOverlay:
 
     @staticmethod
     def from_dict(d):
-        overlay_type = d.get("type")
-        if overlay_type == "Note":
-            return NoteOverlay.from_dict(d)
-        if overlay_type == "Ruler":
-            return RulerOverlay.from_dict(d)
-        if overlay_type == "ROI":
-            return RegionOfInterestOverlay.from_dict(d)
-        return None
+        overlay_class = _OVERLAY_TYPES.get(d.get("type"))
+        return overlay_class.from_dict(d) if overlay_class else None
 
 
 class NoteOverlay(AnalysisOverlay):
@@ -532,17 +928,37 @@ class NoteOverlay(AnalysisOverlay):
         self.text = text
         self.color = color
 
-    def draw(self, painter, zoom_factor):
-        # Scale coordinates from original image space to display space
-        scaled_pos = QPoint(int(self.position.x() * zoom_factor), int(self.position.y() * zoom_factor))
+    @property
+    def position(self):
+        return self._point(0)
+
+    @position.setter
+    def position(self, value):
+        self._set_point(0, value)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+        self.invalidate()
+
+    def draw(self, painter, zoom_factor, scaled=None):
+        cache = self._cache
+        if cache['zoom'] != zoom_factor:
+            x, y, _, _ = self._scaled(zoom_factor, scaled)
+            cache.update(zoom=zoom_factor, pos=QPoint(x, y), text_pos=(x + 8, y + 8),
+                         font=_arial(int(10 / zoom_factor)))
         
-        painter.setPen(QPen(QColor(self.color), 2))
-        painter.setBrush(QColor(self.color))
-        painter.drawEllipse(scaled_pos, 4, 4)
+        painter.setPen(self._pen)
+        painter.setBrush(self._qcolor)
+        painter.drawEllipse(cache['pos'], 4, 4)
         
-        font = QFont("Arial", int(10 / zoom_factor))
-        painter.setFont(font)
-        painter.drawText(scaled_pos + QPoint(8, 8), self.text)
+        painter.setFont(cache['font'])
+        text_x, text_y = cache['text_pos']
+        painter.drawText(text_x, text_y, self.text)
 
     def to_dict(self):
         d = super().to_dict()
@@ -569,36 +985,72 @@ class RulerOverlay(AnalysisOverlay):
         self.end_point = end_point
         self.color = color
 
-    def draw(self, painter, zoom_factor):
-        # Scale coordinates from original image space to display space
-        scaled_start = QPoint(int(self.start_point.x() * zoom_factor), int(self.start_point.y() * zoom_factor))
-        scaled_end = QPoint(int(self.end_point.x() * zoom_factor), int(self.end_point.y() * zoom_factor))
-        
-        pen = QPen(QColor(self.color), 2, Qt.DashLine)
-        painter.setPen(pen)
-        painter.drawLine(scaled_start, scaled_end)
+    @property
+    def start_point(self):
+        return self._point(0)
+
+    @start_point.setter
+    def start_point(self, value):
+        self._set_point(0, value)
+
+    @property
+    def end_point(self):
+        return self._point(2)
+
+    @end_point.setter
+    def end_point(self, value):
+        self._set_point(2, value)
+
+    @property
+    def distance(self):
+        """Length in image pixels, taken from the store's bulk computation when stored."""
+        if self._store is not None:
+            return float(self._store.distances()[self._row])
+        x1, y1, x2, y2 = (int(v) for v in self._xy)
+        return math.hypot(x2 - x1, y2 - y1)
+
+    def _layout(self, zoom_factor, scaled=None):
+        """Fill the drawing cache for zoom_factor if it is stale, and return it."""
+        cache = self._cache
+        if cache['zoom'] != zoom_factor:
+            x1, y1, x2, y2 = self._scaled(zoom_factor, scaled)
+
+            # Measurement text and note
+            text = f"{self.distance:.1f}px"
+            if 'calibrated_value' in self.data and 'unit' in self.data:
+                text += f" / {self.data['calibrated_value']:.2f} {self.data['unit']}"
+            # Add note if it exists
+            if 'note' in self.data:
+                text += f" ({self.data['note']})"
+
+            # (a + b + 1) >> 1 rounds like QPoint / 2 does
+            cache.update(zoom=zoom_factor, line=(x1, y1, x2, y2),
+                         start=QPoint(x1, y1), end=QPoint(x2, y2),
+                         mid=((x1 + x2 + 1) >> 1, (y1 + y2 + 1) >> 1), text=text,
+                         font=_arial(int(10 / zoom_factor)))
+        return cache
+
+    def display_bounds(self, zoom_factor):
+        """Display-space rect painted at zoom_factor: line, end markers and label."""
+        cache = self._layout(zoom_factor)
+        rect = QRect(cache['start'], cache['end']).normalized()
+        return rect.adjusted(-6, -6, 6, 6).united(self._label_rect(cache))
+
+    def draw(self, painter, zoom_factor, scaled=None):
+        cache = self._layout(zoom_factor, scaled)
+
+        painter.setPen(self._dash_pen)
+        painter.drawLine(*cache['line'])
 
         # Draw endpoints
-        painter.setBrush(QColor(self.color))
-        painter.drawEllipse(scaled_start, 4, 4)
-        painter.drawEllipse(scaled_end, 4, 4)
+        painter.setBrush(self._qcolor)
+        painter.drawEllipse(cache['start'], 4, 4)
+        painter.drawEllipse(cache['end'], 4, 4)
 
         # Draw measurement text and note
-        distance = math.sqrt((self.end_point.x() - self.start_point.x())**2 + (self.end_point.y() - self.start_point.y())**2)
-        mid_point = (scaled_start + scaled_end) / 2
-        
-        font = QFont("Arial", int(10 / zoom_factor))
-        painter.setFont(font)
-        
-        text = f"{distance:.1f}px"
-        if 'calibrated_value' in self.data and 'unit' in self.data:
-            text += f" / {self.data['calibrated_value']:.2f} {self.data['unit']}"
-            
-        # Add note if it exists
-        if 'note' in self.data:
-            text += f" ({self.data['note']})"
-            
-        painter.drawText(mid_point, text)
+        painter.setFont(cache['font'])
+        mid_x, mid_y = cache['mid']
+        painter.drawText(mid_x, mid_y, cache['text'])
 
     def to_dict(self):
         d = super().to_dict()
@@ -627,38 +1079,67 @@ class RegionOfInterestOverlay(AnalysisOverlay):
         self.bottom_right = bottom_right
         self.color = color
 
-    def draw(self, painter, zoom_factor):
-        # Scale coordinates from original image space to display space
-        scaled_tl = QPoint(int(self.top_left.x() * zoom_factor), int(self.top_left.y() * zoom_factor))
-        scaled_br = QPoint(int(self.bottom_right.x() * zoom_factor), int(self.bottom_right.y() * zoom_factor))
-        
+    @property
+    def top_left(self):
+        return self._point(0)
+
+    @top_left.setter
+    def top_left(self, value):
+        self._set_point(0, value)
+
+    @property
+    def bottom_right(self):
+        return self._point(2)
+
+    @bottom_right.setter
+    def bottom_right(self, value):
+        self._set_point(2, value)
+
+    def _layout(self, zoom_factor, scaled=None):
+        """Fill the drawing cache for zoom_factor if it is stale, and return it."""
+        cache = self._cache
+        if cache['zoom'] != zoom_factor:
+            x1, y1, x2, y2 = self._scaled(zoom_factor, scaled)
+
+            # Dimensions text
+            left, top, right, bottom = (int(v) for v in self._xy)
+            width = abs(right - left)
+            height = abs(bottom - top)
+            text = f"{width:.0f} × {height:.0f}px"
+            if 'note' in self.data:
+                text += f" - {self.data['note']}"
+
+            top_left, bottom_right = QPoint(x1, y1), QPoint(x2, y2)
+            cache.update(zoom=zoom_factor, rect=QRect(top_left, bottom_right),
+                         corners=(top_left, bottom_right, QPoint(x2, y1), QPoint(x1, y2)),
+                         mid=((x1 + x2 + 1) >> 1, (y1 + y2 + 1) >> 1), text=text,
+                         font=_arial(int(10 / zoom_factor)))
+        return cache
+
+    def display_bounds(self, zoom_factor):
+        """Display-space rect painted at zoom_factor: box, corner markers and label."""
+        cache = self._layout(zoom_factor)
+        rect = cache['rect'].normalized()
+        return rect.adjusted(-6, -6, 6, 6).united(self._label_rect(cache))
+
+    def draw(self, painter, zoom_factor, scaled=None):
+        cache = self._layout(zoom_factor, scaled)
+
         # Draw rectangle
-        rect = QRect(scaled_tl, scaled_br)
-        painter.setPen(QPen(QColor(self.color), 2, Qt.SolidLine))
-        painter.setBrush(QColor(self.color + "20"))  # Semi-transparent fill
-        painter.drawRect(rect)
+        painter.setPen(self._pen)
+        painter.setBrush(self._fill)
+        painter.drawRect(cache['rect'])
         
         # Draw corner markers
-        painter.setBrush(QColor(self.color))
-        painter.drawEllipse(scaled_tl, 4, 4)
-        painter.drawEllipse(scaled_br, 4, 4)
-        painter.drawEllipse(QPoint(scaled_br.x(), scaled_tl.y()), 4, 4)
-        painter.drawEllipse(QPoint(scaled_tl.x(), scaled_br.y()), 4, 4)
+        painter.setBrush(self._qcolor)
+        for corner in cache['corners']:
+            painter.drawEllipse(corner, 4, 4)
         
         # Draw dimensions
-        width = abs(self.bottom_right.x() - self.top_left.x())
-        height = abs(self.bottom_right.y() - self.top_left.y())
-        mid_point = (scaled_tl + scaled_br) / 2
-        
-        font = QFont("Arial", int(10 / zoom_factor))
-        painter.setFont(font)
-        painter.setPen(QPen(QColor(self.color), 1))
-        
-        text = f"{width:.0f} × {height:.0f}px"
-        if 'note' in self.data:
-            text += f" - {self.data['note']}"
-            
-        painter.drawText(mid_point, text)
+        painter.setFont(cache['font'])
+        painter.setPen(self._text_pen)
+        mid_x, mid_y = cache['mid']
+        painter.drawText(mid_x, mid_y, cache['text'])
 
     def to_dict(self):
         d = super().to_dict()
@@ -678,12 +1159,122 @@ class RegionOfInterestOverlay(AnalysisOverlay):
         bottom_right = QPoint(br_tuple[0], br_tuple[1])
         return RegionOfInterestOverlay(top_left, bottom_right, data.get("color"), data)
 
+# Overlay "type" value -> class, used by AnalysisOverlay.from_dict
+_OVERLAY_TYPES = {
+    "Note": NoteOverlay,
+    "Ruler": RulerOverlay,
+    "ROI": RegionOfInterestOverlay,
+}
+
+class OverlayStore:
+    """Analysis overlays backed by one (N, 4) int32 coordinate buffer."""
+    def __init__(self, overlays=()):
+        self._items = []
+        self._coords = np.zeros((16, 4), dtype=np.int32)
+        # All coordinates scaled for the last zoom drawn at
+        self._scaled = None
+        self._scaled_zoom = None
+        # Point-to-point length of every row, rebuilt after geometry changes
+        self._distances = None
+        self.extend(overlays)
+
+    def invalidate(self):
+        self._scaled_zoom = None
+        self._distances = None
+
+    def _bind(self, start=0):
+        """Point overlays from start onwards at their rows of the buffer."""
+        for row in range(start, len(self._items)):
+            self._items[row]._xy = self._coords[row]
+            self._items[row]._row = row
+
+    def _release(self, overlay):
+        # A removed overlay keeps a private copy of its geometry
+        overlay._xy = overlay._xy.copy()
+        overlay._store = None
+        overlay._row = None
+
+    def append(self, overlay):
+        row = len(self._items)
+        if row == len(self._coords):
+            grown = np.zeros((2 * row, 4), dtype=np.int32)
+            grown[:row] = self._coords
+            self._coords = grown
+            self._bind()
+        self._coords[row] = overlay._xy
+        overlay._xy = self._coords[row]
+        overlay._store = self
+        overlay._row = row
+        self._items.append(overlay)
+        self.invalidate()
+
+    def extend(self, overlays):
+        for overlay in overlays:
+            self.append(overlay)
+
+    def clear(self):
+        for overlay in self._items:
+            self._release(overlay)
+        self._items.clear()
+        self.invalidate()
+
+    def __delitem__(self, index):
+        index = range(len(self._items))[index]
+        self._release(self._items.pop(index))
+        n = len(self._items)
+        self._coords[index:n] = self._coords[index + 1:n + 1]
+        self._bind(index)
+        self.invalidate()
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def distances(self):
+        """Start-to-end length of every stored overlay, in image pixels."""
+        if self._distances is None:
+            coords = self._coords[:len(self._items)]
+            self._distances = np.hypot(coords[:, 2] - coords[:, 0], coords[:, 3] - coords[:, 1])
+        return self._distances
+
+    def draw_all(self, painter, zoom_factor):
+        """Draw every overlay, scaling all coordinates in one vectorised step."""
+        if self._scaled_zoom != zoom_factor:
+            self._scaled = (self._coords[:len(self._items)] * zoom_factor).astype(np.int32)
+            self._scaled_zoom = zoom_factor
+        for overlay, scaled in zip(self._items, self._scaled):
+            overlay.draw(painter, zoom_factor, scaled)
+
 class Annotation:
     def __init__(self, annotation_type, position, data=None):
         self.type = annotation_type
         self.position = position
         self.data = data or {}
-        self.id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        self.id = _make_id()
+        # Parsed once here so statistics never have to re-parse the text.
+        # float() also accepts "nan" and "inf", which would break the sorted
+        # measurement list and the running sum, so those count as no value.
+        self._value_float = None
+        if self.type in MEASUREMENT_TYPES:
+            try:
+                value = float(self.data.get("value", 0))
+            except (TypeError, ValueError):
+                pass
+            else:
+                if math.isfinite(value):
+                    self._value_float = value
+
+    def to_dict(self):
+        """Serializable form, as saved to settings and exported."""
+        data = {"type": self.type, "id": self.id, "data": self.data}
+        if self.position:
+            data["position"] = {"x": self.position.x(), "y": self.position.y()}
+        return data
     
     def draw(self, painter, zoom_factor=1.0):
         if not self.position:
@@ -694,13 +1285,13 @@ class Annotation:
         painter.setPen(QPen(color, 2))
         
         # Draw based on annotation type
-        if self.type in ["Seizure", "Artifact", "Normal", "Abnormal"]:
+        if self.type in EVENT_TYPES:
             # Draw event marker
             x, y = self.position.x(), self.position.y()
             painter.drawEllipse(QPoint(x, y), 8, 8)
             painter.drawText(x + 12, y + 4, self.type[:3])
         
-        elif self.type in ["Amplitude", "Frequency", "Duration", "Latency"]:
+        elif self.type in MEASUREMENT_TYPES:
             # Draw measurement marker
             x, y = self.position.x(), self.position.y()
             painter.drawRect(x - 5, y - 5, 10, 10)
@@ -713,12 +1304,188 @@ class Annotation:
             x, y = self.position.x(), self.position.y()
             painter.drawEllipse(QPoint(x, y), 6, 6)
 
+class AnnotationStore:
+    """List of annotations that keeps per-type counts and measurement stats current."""
+    def __init__(self, items=()):
+        self._items = []
+        self._type_counts = Counter()
+        self._measurements = []  # kept sorted so min/max are O(1)
+        self._measurement_sum = 0.0
+        self.extend(items)
+
+    def _track(self, annotation):
+        self._type_counts[annotation.type] += 1
+        if annotation._value_float is not None:
+            bisect.insort(self._measurements, annotation._value_float)
+            self._measurement_sum += annotation._value_float
+
+    def _untrack(self, annotation):
+        self._type_counts[annotation.type] -= 1
+        if self._type_counts[annotation.type] <= 0:
+            del self._type_counts[annotation.type]
+        if annotation._value_float is not None:
+            del self._measurements[bisect.bisect_left(self._measurements, annotation._value_float)]
+            self._measurement_sum -= annotation._value_float
+
+    def append(self, annotation):
+        self._items.append(annotation)
+        self._track(annotation)
+
+    def extend(self, annotations):
+        for annotation in annotations:
+            self.append(annotation)
+
+    def insert(self, index, annotation):
+        self._items.insert(index, annotation)
+        self._track(annotation)
+
+    def pop(self, index=-1):
+        annotation = self._items.pop(index)
+        self._untrack(annotation)
+        return annotation
+
+    def remove(self, annotation):
+        self._items.remove(annotation)
+        self._untrack(annotation)
+
+    def clear(self):
+        self._items.clear()
+        self._type_counts.clear()
+        self._measurements.clear()
+        self._measurement_sum = 0.0
+
+    def __delitem__(self, index):
+        removed = self._items[index]
+        del self._items[index]
+        for annotation in (removed if isinstance(index, slice) else [removed]):
+            self._untrack(annotation)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @property
+    def type_counts(self):
+        return self._type_counts
+
+    @property
+    def measurement_count(self):
+        return len(self._measurements)
+
+    @property
+    def measurement_mean(self):
+        return self._measurement_sum / len(self._measurements) if self._measurements else 0.0
+
+    @property
+    def measurement_min(self):
+        return self._measurements[0] if self._measurements else 0.0
+
+    @property
+    def measurement_max(self):
+        return self._measurements[-1] if self._measurements else 0.0
+
+class OverlayLayerWidget(QWidget):
+    """Transparent layer over the image label that paints the analysis overlays.
+
+    Keeping the overlays off the image pixmap means editing them only repaints
+    this layer, and zooming with no overlays costs nothing extra.
+    """
+    def __init__(self, viewer, parent):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.zoom = 1.0  # zoom of the image currently shown beneath
+        # Area the drawing preview was last invalidated for
+        self.preview_rect = None
+        # Mouse input still goes to the label and viewer, as before
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+
+    def update_preview(self, overlay):
+        """Repaint just where the preview overlay was and now is."""
+        rect = overlay.display_bounds(self.zoom)
+        if self.preview_rect is not None:
+            self.update(rect.united(self.preview_rect))
+        else:
+            self.update(rect)
+        self.preview_rect = rect
+
+    def paintEvent(self, event):
+        viewer = self.viewer
+        if not viewer.analysis_overlays and viewer.drawing_overlay is None:
+            return
+        painter = QPainter(self)
+        viewer.analysis_overlays.draw_all(painter, self.zoom)
+        # Overlay being drawn (preview)
+        if viewer.drawing_overlay:
+            viewer.drawing_overlay.draw(painter, self.zoom)
+        painter.end()
+
+class OverlayNoteDock(QDockWidget):
+    """Dock with a note field for the ruler or region just drawn.
+
+    It replaces a modal prompt per overlay, so drawing carries on while the
+    note is typed; the text is attached when editing finishes. Return (or
+    Escape, to skip the note) hides the dock and gives the keyboard back to
+    the viewer's shortcuts.
+    """
+    def __init__(self, viewer):
+        super().__init__("Overlay Note", viewer)
+        self.viewer = viewer
+        self.overlay = None
+        self.setObjectName("overlay_note_dock")
+        self.note_edit = QLineEdit()
+        self.note_edit.setPlaceholderText("Note for the last ruler or region (optional)")
+        self.note_edit.editingFinished.connect(self.apply_note)
+        self.note_edit.returnPressed.connect(self.finish)
+        self.setWidget(self.note_edit)
+
+    def prompt_for(self, overlay):
+        """Show the dock and focus the note field for overlay."""
+        # A note still being typed belongs to the previous overlay
+        self.apply_note()
+        self.overlay = overlay
+        self.note_edit.clear()
+        self.show()
+        self.note_edit.setFocus()
+
+    def apply_note(self):
+        if self.overlay is None:
+            return
+        note = self.note_edit.text().strip()
+        if note:
+            self.overlay.data['note'] = note
+            self.overlay.invalidate()
+            self.viewer.update_overlays()
+        self.overlay = None
+
+    def finish(self):
+        """Attach the note, then hide the dock and refocus the viewer."""
+        self.apply_note()
+        self.note_edit.clear()
+        self.hide()
+        self.viewer.setFocus()
+
+    def keyPressEvent(self, event):
+        # QLineEdit leaves Escape to its parent
+        if event.key() == Qt.Key_Escape:
+            self.overlay = None
+            self.finish()
+        else:
+            super().keyPressEvent(event)
+
 class MeasurementGridWidget(QWidget):
     """A draggable and resizable grid widget for EEG measurement."""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
+        # paintEvent replaces every exposed pixel from the buffer, so Qt's
+        # clear to transparent beforehand would be wasted
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
         self.setGeometry(150, 150, 300, 200)
         
         self.drag_position = None
@@ -735,6 +1502,40 @@ class MeasurementGridWidget(QWidget):
         self.x_val_per_tick = 100
         self.y_val_per_tick = 50
 
+        # Pre-rendered grid, redrawn only on resize or calibration changes
+        self._buffer = None
+        # One grid cell, tiled across the widget; rebuilt with the calibration
+        self._grid_tile = None
+
+    def invalidate_buffer(self):
+        """Re-render the grid on the next paint; call after changing calibration."""
+        self._buffer = None
+        self._grid_tile = None
+        self.update()
+
+    def update_calibration(self, calibration):
+        """Apply a Calibration, re-rendering the grid once for all six values."""
+        self.x_pixels_per_unit = calibration.x_px
+        self.x_val_per_tick = calibration.x_val
+        self.x_unit_name = calibration.x_unit
+        self.y_pixels_per_unit = calibration.y_px
+        self.y_val_per_tick = calibration.y_val
+        self.y_unit_name = calibration.y_unit
+        self.invalidate_buffer()
+
+    def _build_grid_tile(self, dpr):
+        """Render one cell's dotted lines, tiled by _redraw_grid_into."""
+        x_step, y_step = self.x_pixels_per_unit, self.y_pixels_per_unit
+        tile = QPixmap(QSize(x_step, y_step) * dpr)
+        tile.setDevicePixelRatio(dpr)
+        tile.fill(Qt.transparent)
+        painter = QPainter(tile)
+        painter.setPen(QPen(QColor(100, 100, 150, 150), 1, Qt.DotLine))
+        painter.drawLine(0, 0, x_step, 0)
+        painter.drawLine(0, 0, 0, y_step)
+        painter.end()
+        return tile
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.resizing = self.is_on_edge(event.pos())
@@ -778,13 +1579,38 @@ class MeasurementGridWidget(QWidget):
         min_width = self.x_pixels_per_unit * 2
         min_height = self.y_pixels_per_unit * 2
         
+        # resize() schedules a repaint itself, and only when the size changes
         self.resize(max(min_width, new_width), max(min_height, new_height))
         self.drag_position = event.globalPos()
-        self.update() # Repaint on resize
+
+    def resizeEvent(self, event):
+        self._buffer = None
+        super().resizeEvent(event)
 
     def paintEvent(self, event):
+        # This stays a raster widget: a translucent frameless top-level can't be
+        # a QOpenGLWidget reliably, and with the grid pre-rendered a repaint is
+        # just a blit of the exposed area.
+        if self._buffer is None:
+            dpr = self.devicePixelRatioF()
+            self._buffer = QPixmap(self.size() * dpr)
+            self._buffer.setDevicePixelRatio(dpr)
+            self._buffer.fill(Qt.transparent)
+            self._redraw_grid_into(self._buffer)
+        # Copy only the exposed parts of the buffer. Source mode writes its
+        # alpha as is, replacing whatever the uncleared backing store held.
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        dpr = self._buffer.devicePixelRatio()
+        for rect in event.region().rects():
+            source = QRect(int(rect.x() * dpr), int(rect.y() * dpr),
+                           int(rect.width() * dpr), int(rect.height() * dpr))
+            painter.drawPixmap(rect, self._buffer, source)
+
+    def _redraw_grid_into(self, device):
+        # No antialiasing: everything but the text is axis-aligned, and text
+        # antialiasing is on by default
+        painter = QPainter(device)
 
         # Background
         bg_color = QColor(20, 20, 40, 180) # Dark blue, semi-transparent
@@ -792,19 +1618,11 @@ class MeasurementGridWidget(QWidget):
         painter.setPen(QPen(QColor(150, 150, 255), 1, Qt.DashLine))
         painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
 
-        # Grid lines
-        pen = QPen(QColor(100, 100, 150, 150), 1, Qt.DotLine)
-        painter.setPen(pen)
-        
-        # Horizontal lines
-        for i in range(1, self.height() // self.y_pixels_per_unit):
-            y = i * self.y_pixels_per_unit
-            painter.drawLine(0, y, self.width(), y)
-            
-        # Vertical lines
-        for i in range(1, self.width() // self.x_pixels_per_unit):
-            x = i * self.x_pixels_per_unit
-            painter.drawLine(x, 0, x, self.height())
+        # Grid lines, tiled from a single pre-rendered cell inside the border
+        if self._grid_tile is None:
+            self._grid_tile = self._build_grid_tile(device.devicePixelRatioF())
+        # Offset so the tile's edge lines land on multiples of the cell size
+        painter.drawTiledPixmap(self.rect().adjusted(1, 1, -1, -1), self._grid_tile, QPoint(1, 1))
 
         # Measurement Text
         font = QFont("Arial", 10)
@@ -821,6 +1639,27 @@ class MeasurementGridWidget(QWidget):
 
         painter.drawText(5, 15, width_text)
         painter.drawText(5, 35, height_text)
+        painter.end()
+
+@dataclass(frozen=True)
+class Calibration:
+    """Grid calibration, saved in the "calibration" settings group."""
+    x_px: int = 50
+    x_val: float = 100.0
+    x_unit: str = "ms"
+    y_px: int = 50
+    y_val: float = 50.0
+    y_unit: str = "µV"
+
+    @classmethod
+    def from_settings(cls, settings, prefix=""):
+        """Read each field as its annotated type, defaulting where unset."""
+        return cls(**{field.name: settings.value(prefix + field.name, field.default, type=field.type)
+                      for field in fields(cls)})
+
+    def save(self, settings):
+        for field in fields(self):
+            settings.setValue(field.name, getattr(self, field.name))
 
 class CalibrationDialog(QDialog):
     """Dialog for setting grid calibration."""
@@ -861,7 +1700,116 @@ class CalibrationDialog(QDialog):
             "y_px": int(self.y_pixels_edit.text()), "y_val": float(self.y_value_edit.text()), "y_unit": self.y_unit_edit.text()
         }
 
+def _minify_qss(qss):
+    """Strip the layout whitespace from a stylesheet, so Qt parses fewer bytes."""
+    qss = re.sub(r"\s+", " ", qss)
+    return re.sub(r" ?([{};,]) ?|(:) ", r"\1\2", qss).strip()
+
+# Application-wide dark theme, set once on the QApplication so every window
+# and dialog inherits it instead of parsing a sheet of its own
+_APP_QSS = _minify_qss("""
+QWidget {
+    background-color: #2e2e2e;
+    color: #ffffff;
+    border: none;
+}
+QMainWindow, QDialog {
+    background-color: #3c3c3c;
+    border: 1px solid #555;
+}
+QPushButton {
+    background-color: #555555;
+    border: 1px solid #666666;
+    padding: 5px;
+    border-radius: 2px;
+}
+QPushButton:hover {
+    background-color: #666666;
+}
+QPushButton:pressed {
+    background-color: #4d4d4d;
+}
+QSlider::groove:horizontal {
+    background: #444444;
+    height: 8px;
+    border-radius: 4px;
+}
+QSlider::handle:horizontal {
+    background: #888888;
+    border: 1px solid #999999;
+    width: 14px;
+    margin: -4px 0;
+    border-radius: 7px;
+}
+QLabel, QCheckBox, QRadioButton {
+    background-color: transparent;
+}
+QSpinBox, QLineEdit, QTextEdit, QComboBox {
+    border: 1px solid #555;
+    padding: 3px;
+    background-color: #2e2e2e;
+    color: #fff;
+    border-radius: 2px;
+}
+QComboBox::drop-down {
+    border-left: 1px solid #555;
+}
+QTableWidget {
+    gridline-color: #555;
+    background-color: #2e2e2e;
+    color: #fff;
+}
+QHeaderView::section {
+    background-color: #444;
+    padding: 4px;
+    border: 1px solid #555;
+    color: #fff;
+}
+QTabWidget::pane {
+    border: 1px solid #555;
+    border-top: none;
+}
+QTabBar::tab {
+    background: #444;
+    border: 1px solid #555;
+    border-bottom: none;
+    padding: 8px 20px;
+    border-top-left-radius: 4px;
+    border-top-right-radius: 4px;
+    color: #fff;
+    margin-right: 2px;
+}
+QTabBar::tab:selected {
+    background: #3c3c3c;
+    margin-bottom: -1px;
+}
+QStatusBar {
+    background: #2e2e2e;
+}
+QDialog#overlay_manager {
+    background-color: #2e2e2e;
+    border: none;
+}
+QDialog#overlay_manager QTableWidget {
+    background-color: #3e3e3e;
+}
+QDialog#overlay_manager QTableWidget::item {
+    padding: 5px;
+}
+QDialog#overlay_manager QTableWidget::item:selected {
+    background-color: #4CAF50;
+}
+QDialog#overlay_manager QHeaderView::section {
+    background-color: #555555;
+    padding: 5px;
+    border: 1px solid #666666;
+}
+""")
+
 class ImageZoomViewer(QMainWindow):
+    # Forwarded to the live capture worker on its thread
+    capture_interval_changed = pyqtSignal(int)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("EEG Paradox Viewer v2.0")
@@ -873,6 +1821,7 @@ class ImageZoomViewer(QMainWindow):
 
         self.image_label = QLabel()
         self.scroll_area.setWidget(self.image_label)
+        self.overlay_layer = OverlayLayerWidget(self, self.image_label)
 
         # Widgets - Restore original zoom slider
         self.zoom_slider = QSlider(Qt.Horizontal)
@@ -880,7 +1829,13 @@ class ImageZoomViewer(QMainWindow):
         self.zoom_slider.setMaximum(400)
         self.zoom_slider.setTickPosition(QSlider.TicksBelow)
         self.zoom_slider.setTickInterval(10)
-        self.zoom_slider.valueChanged.connect(self.update_zoom)
+        # Slider drags, wheel bumps and drawing previews fire faster than a
+        # redraw takes, so they go through a ~60 Hz single-shot timer instead.
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(16)
+        self._zoom_timer.timeout.connect(self.update_zoom)
+        self.zoom_slider.valueChanged.connect(self.schedule_update_zoom)
 
         self.enhanced_mode_checkbox = QCheckBox("Enable Enhanced Mode")
         self.enhanced_mode_checkbox.stateChanged.connect(self.apply_enhanced_mode)
@@ -997,8 +1952,31 @@ class ImageZoomViewer(QMainWindow):
         self.setCentralWidget(container)
 
         # State
-        self.current_image = None
         self.original_image = None
+        # Pixels of original_image per image coordinate; below 1 for PDF pages
+        # rendered under PDF_MAX_DPI
+        self._source_scale = 1.0
+        self._pdf_dpi = None
+        self._pdf_page_cache = OrderedDict()
+        self._pdf_page_count = 0
+        # One thread, so prefetches queue up rather than contend for _PDF_LOCK
+        self._pdf_pool = QThreadPool(self)
+        self._pdf_pool.setMaxThreadCount(1)
+        # Prefetches in flight by (page, dpi); also keeps the tasks alive
+        self._pdf_prefetch_tasks = {}
+        # Filtered copies of original_image, by the settings they were built with
+        self._processed_cache = OrderedDict()
+        # (source key, LAB image) of the last LAB conversion, shared by modes 1 and 2
+        self._lab_cache = None
+        # CLAHE objects by (clip limit, tile grid), built once and reused
+        self._clahe_cache = {}
+        # Full-resolution pixmap of the processed image; zooming only rescales it
+        self._base_pixmap = None
+        self._base_pixmap_source = None
+        # Pixel buffer behind the QImage the base pixmap was made from
+        self._display_buf = None
+        # Zoom of the pixmap currently shown, set by update_zoom
+        self._zoom_factor = None
         self.center_image_focus = True
         self.default_zoom_enhanced_mode = 250
         self.doc = None
@@ -1012,7 +1990,8 @@ class ImageZoomViewer(QMainWindow):
 
         # Screen capture state
         self.live_capture_active = False
-        self.capture_timer = None
+        self.capture_thread = None
+        self.capture_worker = None
 
         # Panning state
         self.panning = False
@@ -1023,7 +2002,7 @@ class ImageZoomViewer(QMainWindow):
         self.measurement_active = False
         self.annotation_active = False
         self.measurement_tool = MeasurementTool()
-        self.professional_annotations = []  # List of Annotation objects
+        self.professional_annotations = AnnotationStore()  # Annotation objects
         self.saved_positions = {}
         self.drawing = False
         self.last_draw_point = None
@@ -1034,7 +2013,7 @@ class ImageZoomViewer(QMainWindow):
         # Analysis state
         self.analysis_mode_active = False
         self.current_analysis_tool = "Note"
-        self.analysis_overlays = []  # Store all overlay objects
+        self.analysis_overlays = OverlayStore()  # Store all overlay objects
         self.drawing_overlay = None  # Currently being drawn
         self.drawing_start_point = None
 
@@ -1049,10 +2028,16 @@ class ImageZoomViewer(QMainWindow):
         # Add a status bar for user feedback
         self.setStatusBar(QStatusBar(self))
 
+        # Notes for new rulers and regions are typed here, shown on demand
+        self._annotation_dock = OverlayNoteDock(self)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self._annotation_dock)
+        self._annotation_dock.hide()
+
         # Restore settings
         self.restore_session()
 
         self.measurement_grid = None
+        self._calibration = None  # read from settings on first use
 
     def select_capture_source(self):
         if SCREEN_CAPTURE_METHOD != "mss":
@@ -1067,26 +2052,21 @@ class ImageZoomViewer(QMainWindow):
     def _get_capture_area(self):
         """Get the capture area for screen capture."""
         try:
-            with mss.mss() as sct:
-                # Always capture the primary monitor for now
-                return sct.monitors[1]  # Primary monitor
+            # Always capture the primary monitor for now
+            return get_sct().monitors[1]  # Primary monitor
         except Exception as e:
             print(f"Error getting capture area: {e}")
             # Fallback to a default area
             return {"left": 0, "top": 0, "width": 1920, "height": 1080}
 
     def _grab_and_load(self, capture_area):
-        """Grabs the image and loads it as BGR."""
+        """Grabs the image and loads it as BGRA."""
         try:
             if SCREEN_CAPTURE_METHOD == "mss":
-                with mss.mss() as sct:
-                    sct_img = sct.grab(capture_area)
-                    # Convert BGRA from MSS to BGR
-                    img = cv2.cvtColor(np.array(sct_img), cv2.COLOR_BGRA2BGR)
-            elif SCREEN_CAPTURE_METHOD == "pil":
-                pil_img = ImageGrab.grab()
-                # Convert PIL's RGB to BGR
-                img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+                sct_img = get_sct().grab(capture_area)
+                # Keep the BGRA frame as a view over mss's buffer; it is
+                # only converted if a filter needs an RGB image.
+                img = np.asarray(sct_img)
             else:
                 print("No screen capture method available")
                 return
@@ -1096,10 +2076,7 @@ class ImageZoomViewer(QMainWindow):
                 self.raise_()
                 self.activateWindow()
 
-            self.original_image = img
-            self.current_image = img.copy()
-            self.doc = None
-            self.page_selector.setMaximum(1)
+            self._load_frame(img)
             self.update_zoom()
         
         except Exception as e:
@@ -1107,6 +2084,20 @@ class ImageZoomViewer(QMainWindow):
             if not self.live_capture_active: 
                 self.showNormal()
 
+    def _load_frame(self, img):
+        """Make a captured BGRA frame the current image."""
+        self._set_original_image(img)
+        self._set_pdf(None)
+        self.page_selector.setMaximum(1)
+
+    def _on_live_frame(self, frame):
+        """Receives frames from the capture worker on the GUI thread."""
+        if self.live_capture_active:
+            self._load_frame(frame)
+            self.schedule_update_zoom()
+        if self.capture_worker:
+            self.capture_worker.busy = False
+
     def _do_capture(self, live=False):
         """High-level capture command."""
         capture_area = self._get_capture_area()
@@ -1147,6 +2138,9 @@ class ImageZoomViewer(QMainWindow):
         print("Starting live capture...")
         self.live_capture_active = True
         self.live_capture_checkbox.setChecked(True)
+        if self.capture_thread:
+            # Checking the box above re-entered this method, which did the rest
+            return
         self.capture_button.setText("Stop Live")
         
         # Disconnect old signal and connect new one
@@ -1163,15 +2157,20 @@ class ImageZoomViewer(QMainWindow):
         # Show status
         self.statusBar().showMessage("Live capture started")
 
-        # Create and start timer
-        self.capture_timer = QTimer()
-        self.capture_timer.timeout.connect(self.live_capture_update)
-        
         # Get selected FPS and convert to milliseconds
         selected_fps = self.fps_combo.currentData()
         interval_ms = int(1000 / selected_fps)  # Convert FPS to milliseconds
-        print(f"Starting timer with {selected_fps} FPS ({interval_ms}ms interval)")
-        self.capture_timer.start(interval_ms)
+        print(f"Starting capture thread with {selected_fps} FPS ({interval_ms}ms interval)")
+
+        # Frames are grabbed on a worker thread; only display happens here
+        self.capture_thread = QThread(self)
+        self.capture_worker = CaptureWorker(self._get_capture_area(), interval_ms)
+        self.capture_worker.moveToThread(self.capture_thread)
+        self.capture_thread.started.connect(self.capture_worker.start)
+        self.capture_thread.finished.connect(self.capture_worker.deleteLater)
+        self.capture_worker.frame_ready.connect(self._on_live_frame)
+        self.capture_interval_changed.connect(self.capture_worker.set_interval)
+        self.capture_thread.start()
 
     def stop_live_capture(self):
         """Stop live capture mode."""
@@ -1180,10 +2179,16 @@ class ImageZoomViewer(QMainWindow):
         self.live_capture_checkbox.setChecked(False)
         self.capture_button.setText("Capture")
         
-        # Stop timer
-        if self.capture_timer:
-            self.capture_timer.stop()
-            self.capture_timer = None
+        # Stop the worker's timer on its own thread, then end the thread
+        if self.capture_thread:
+            QMetaObject.invokeMethod(self.capture_worker, "stop", Qt.BlockingQueuedConnection)
+            self.capture_thread.quit()
+            self.capture_thread.wait()
+            # The worker went with the thread's finished signal; the thread
+            # is parented to the viewer and would otherwise outlive the capture
+            self.capture_thread.deleteLater()
+            self.capture_thread = None
+            self.capture_worker = None
         
         # Reconnect original signal
         try: 
@@ -1195,19 +2200,12 @@ class ImageZoomViewer(QMainWindow):
         # Show status
         self.statusBar().showMessage("Live capture stopped")
 
-    def live_capture_update(self):
-        """Update function called by the timer for live capture."""
-        if not self.live_capture_active:
-            return
-        print("Live capture update...")
-        self._do_capture(live=True)
-
     def update_fps(self):
         """Update the FPS if live capture is active."""
-        if self.live_capture_active and self.capture_timer:
+        if self.live_capture_active and self.capture_worker:
             selected_fps = self.fps_combo.currentData()
             interval_ms = int(1000 / selected_fps)
-            self.capture_timer.setInterval(interval_ms)
+            self.capture_interval_changed.emit(interval_ms)
 
     def open_file(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open Image or PDF", "", "Images (*.png *.jpg *.bmp *.tif);;PDF Files (*.pdf)")
@@ -1217,150 +2215,333 @@ class ImageZoomViewer(QMainWindow):
         self.settings.setValue("last_file", file_path)
 
         if file_path.lower().endswith('.pdf'):
-            self.doc = fitz.open(file_path)
-            self.page_selector.setMaximum(len(self.doc))
+            self._set_pdf(*open_pdf(file_path))
+            self.page_selector.setMaximum(self._pdf_page_count)
             self.current_page_index = 0
             self.load_pdf_page(self.current_page_index)
         else:
-            self.doc = None
-            # imread already provides BGR, which is our new standard.
-            self.original_image = cv2.imread(file_path)
-            self.current_image = self.original_image.copy()
+            self._set_pdf(None)
+            self._set_original_image(_read_image_rgb(file_path))
             self.page_selector.setMaximum(1)
             self.update_zoom()
 
-    def load_pdf_page(self, page_number):
+    def _set_original_image(self, image, source_scale=1.0):
+        """Replace the image being viewed; source_scale is its pixels per image coordinate."""
+        self.original_image = image
+        self._source_scale = source_scale
+        self.invalidate_processed_image()
+
+    def _logical_size(self):
+        """Size of the image in image coordinates, whatever it was rendered at."""
+        h, w = self.original_image.shape[:2]
+        if self._source_scale == 1.0:
+            return w, h
+        return round(w / self._source_scale), round(h / self._source_scale)
+
+    def _set_pdf(self, doc, page_count=0):
+        """Make doc (or None) the open PDF, closing the previous one."""
+        old_doc = self.doc
+        self.doc = doc
+        self._pdf_page_count = page_count
+        self._pdf_page_cache.clear()
+        self._pdf_prefetch_tasks.clear()
+        if old_doc is not None:
+            # Waits for a render of it in progress; queued ones then fail
+            close_pdf(old_doc)
+
+    def _render_pdf_page(self, page_number, dpi):
+        """Rasterise a page as RGB, reusing recent renders."""
+        key = (page_number, dpi)
+        image = self._pdf_page_cache.get(key)
+        if image is not None:
+            self._pdf_page_cache.move_to_end(key)
+            return image
+        image = self._take_pdf_prefetch(key)
+        if image is None:
+            image = render_pdf_page(self.doc, page_number, dpi)
+        self._cache_pdf_page(key, image)
+        return image
+
+    def _take_pdf_prefetch(self, key):
+        """Wait for a prefetch of key that is already rendering and return its image.
+
+        Returns None if there is none, it failed, or it hadn't started yet;
+        a queued one is cancelled, since rendering it here is no slower.
+        """
+        task = self._pdf_prefetch_tasks.pop(key, None)
+        if task is None or self._pdf_pool.tryTake(task):
+            return None
+        task.done.wait()
+        return task.image
+
+    def _cache_pdf_page(self, key, image):
+        self._pdf_page_cache[key] = image
+        if len(self._pdf_page_cache) > PDF_PAGE_CACHE_SIZE:
+            self._pdf_page_cache.popitem(last=False)
+
+    def _prefetch_pdf_page(self, page_number, dpi):
+        """Render a page in the background, so turning to it is instant."""
+        key = (page_number, dpi)
+        if (not 0 <= page_number < self._pdf_page_count
+                or key in self._pdf_page_cache or key in self._pdf_prefetch_tasks):
+            return
+        doc = self.doc
+        task = _PdfRenderTask(doc, page_number, dpi)
+
+        def finished(image):
+            # Drop renders of a document that has since been replaced
+            if self._pdf_prefetch_tasks.get(key) is task:
+                del self._pdf_prefetch_tasks[key]
+                self._cache_pdf_page(key, image)
+
+        def failed(error):
+            if self._pdf_prefetch_tasks.get(key) is task:
+                del self._pdf_prefetch_tasks[key]
+                print(f"Error prefetching page {page_number + 1}: {error}")
+
+        task.signals.finished.connect(finished)
+        task.signals.failed.connect(failed)
+        self._pdf_prefetch_tasks[key] = task
+        self._pdf_pool.start(task)
+
+    def load_pdf_page(self, page_number, prefetch=True):
+        """Show a page at the DPI the zoom needs, then prefetch the next one.
+
+        Re-renders for a new DPI pass prefetch=False, so dragging the zoom
+        doesn't queue a render at every step it passes through.
+        """
         if self.doc is None:
             return
-        page = self.doc.load_page(page_number)
-        pix = page.get_pixmap(dpi=300)
-        image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
-        
-        # PyMuPDF gives BGRA or BGR. Ensure it is BGR.
-        if pix.n == 4:
-            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
-
-        self.original_image = image
-        self.current_image = image.copy()
+        dpi = pdf_dpi_for_zoom(self.zoom_slider.value())
+        image = self._render_pdf_page(page_number, dpi)
+        self._pdf_dpi = dpi
+        self._set_original_image(image, dpi / PDF_MAX_DPI)
         self.update_zoom()
+        if prefetch:
+            self._prefetch_pdf_page(page_number + 1, dpi)
 
     def next_page(self):
-        if self.doc and self.current_page_index < len(self.doc) - 1:
+        if self.doc is not None and self.current_page_index < self._pdf_page_count - 1:
             self.current_page_index += 1
-            self.page_selector.setValue(self.current_page_index + 1)
+            self._show_page_number()
             self.load_pdf_page(self.current_page_index)
 
     def prev_page(self):
-        if self.doc and self.current_page_index > 0:
+        if self.doc is not None and self.current_page_index > 0:
             self.current_page_index -= 1
-            self.page_selector.setValue(self.current_page_index + 1)
+            self._show_page_number()
             self.load_pdf_page(self.current_page_index)
 
+    def _show_page_number(self):
+        """Show the current page in the selector without its valueChanged loading it again."""
+        self.page_selector.blockSignals(True)
+        self.page_selector.setValue(self.current_page_index + 1)
+        self.page_selector.blockSignals(False)
+
     def goto_page(self):
         index = self.page_selector.value() - 1
-        if self.doc and 0 <= index < len(self.doc):
+        if self.doc is not None and 0 <= index < self._pdf_page_count:
             self.current_page_index = index
             self.load_pdf_page(self.current_page_index)
 
-    def update_zoom(self):
-        if self.original_image is None:
-            return
-        scale_percent = self.zoom_slider.value()
-        self.settings.setValue("last_zoom", scale_percent)
+    def invalidate_processed_image(self):
+        """Forget the cached filtered images; call whenever original_image is replaced."""
+        self._processed_cache.clear()
+        self._lab_cache = None
 
-        # working_image is now always BGR.
-        working_image = self.original_image.copy()
+    def _get_lab(self, image, key=None):
+        """Convert an RGB image to LAB, reusing the last conversion made under key.
 
-        # All filter logic operates directly on the BGR image.
-        if self.enhanced_mode_checkbox.isChecked() and self.contrast_mode != 0:
-            mode = self.contrast_mode
-            if mode == 1:
-                lab = cv2.cvtColor(working_image, cv2.COLOR_BGR2LAB)
-                l, a, b = cv2.split(lab)
-                clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+        The returned array may be the cached one and must not be modified.
+        """
+        if key is not None and self._lab_cache is not None and self._lab_cache[0] == key:
+            return self._lab_cache[1]
+        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        if key is not None:
+            self._lab_cache = (key, lab)
+        return lab
+
+    def _get_clahe(self, clip, grid=(8, 8)):
+        """Return a shared CLAHE object for these settings."""
+        key = (clip, grid)
+        clahe = self._clahe_cache.get(key)
+        if clahe is None:
+            clahe = self._clahe_cache[key] = cv2.createCLAHE(clipLimit=clip, tileGridSize=grid)
+        return clahe
+
+    def _filters_active(self):
+        return (self.enhanced_mode_checkbox.isChecked() and self.contrast_mode != 0) \
+            or self.trace_enhancement_active
+
+    def _compute_enhanced(self, image, mode, source_key=None):
+        """Apply contrast mode 1-7 to an RGB image (ndarray or cv2.UMat).
+
+        Gray modes (4-7) return a single-channel image. With a source_key
+        identifying the input, its LAB conversion is kept for the next mode.
+        """
+        if mode == 1:
+            # Only the L and S planes change, so they are swapped in place
+            # rather than splitting and re-merging every channel
+            lab = self._get_lab(image, source_key)
+            l = self._get_clahe(3.0).apply(cv2.extractChannel(lab, 0))
+            # A cached LAB image is shared, so L goes into a copy of it
+            lab = cv2.insertChannel(l, lab.copy() if source_key is not None else lab, 0)
+            hsv = cv2.cvtColor(cv2.cvtColor(lab, cv2.COLOR_LAB2RGB), cv2.COLOR_RGB2HSV)
+            # Saturating uint8 scale, no float intermediates or clip pass
+            hsv = cv2.insertChannel(cv2.convertScaleAbs(cv2.extractChannel(hsv, 1), alpha=1.3), hsv, 1)
+            image = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+        elif mode == 2:
+            l, a, b = cv2.split(self._get_lab(image, source_key))
+            clahe = self._get_clahe(5.0)
+            if isinstance(image, cv2.UMat):
+                # Already queued on the OpenCL device, which runs them in order
                 l = clahe.apply(l)
-                lab = cv2.merge([l, a, b])
-                working_image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-                hsv = cv2.cvtColor(working_image, cv2.COLOR_BGR2HSV)
-                hsv[:, :, 1] = cv2.multiply(hsv[:, :, 1], 1.3)
-                hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
-                working_image = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-            elif mode == 2:
-                lab = cv2.cvtColor(working_image, cv2.COLOR_BGR2LAB)
-                l, a, b = cv2.split(lab)
-                clahe = cv2.createCLAHE(clipLimit=5.0, tileGridSize=(8,8))
+                a = cv2.convertScaleAbs(a, alpha=1.2)
+                b = cv2.convertScaleAbs(b, alpha=1.2)
+            else:
+                # The three planes are independent; a and b scale while L equalises
+                pool = _filter_pool()
+                fa = pool.submit(cv2.convertScaleAbs, a, alpha=1.2)
+                fb = pool.submit(cv2.convertScaleAbs, b, alpha=1.2)
                 l = clahe.apply(l)
-                a = cv2.multiply(a, 1.2)
-                b = cv2.multiply(b, 1.2)
-                a = np.clip(a, 0, 255)
-                b = np.clip(b, 0, 255)
-                lab = cv2.merge([l, a, b])
-                working_image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-            elif mode == 3:
-                hsv = cv2.cvtColor(working_image, cv2.COLOR_BGR2HSV)
-                hsv[:, :, 2] = 255 - hsv[:, :, 2]
-                working_image = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-            elif mode == 4:
-                gray = cv2.cvtColor(working_image, cv2.COLOR_BGR2GRAY)
-                inverted = cv2.bitwise_not(gray)
-                working_image = cv2.cvtColor(inverted, cv2.COLOR_GRAY2BGR)
-            elif mode == 5:
-                gray = cv2.cvtColor(working_image, cv2.COLOR_BGR2GRAY)
-                clahe = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(8,8))
-                enhanced_gray = clahe.apply(gray)
-                working_image = cv2.cvtColor(enhanced_gray, cv2.COLOR_GRAY2BGR)
-            elif mode == 6:
-                gray = cv2.cvtColor(working_image, cv2.COLOR_BGR2GRAY)
-                clahe = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(8,8))
-                enhanced_gray = clahe.apply(gray)
-                inverted = cv2.bitwise_not(enhanced_gray)
-                working_image = cv2.cvtColor(inverted, cv2.COLOR_GRAY2BGR)
-            elif mode == 7:
-                gray = cv2.cvtColor(working_image, cv2.COLOR_BGR2GRAY)
-                _, thresh = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY)
-                working_image = cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
+                a, b = fa.result(), fb.result()
+            lab = cv2.merge([l, a, b])
+            image = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB)
+        elif mode == 3:
+            hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+            hsv = cv2.insertChannel(cv2.bitwise_not(cv2.extractChannel(hsv, 2)), hsv, 2)
+            image = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+        # The gray modes stay single-channel through trace enhancement
+        # and display, and work in place on the one gray buffer.
+        elif mode == 4:
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            image = cv2.bitwise_not(gray, dst=gray)
+        elif mode == 5:
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            image = self._get_clahe(4.0).apply(gray)
+        elif mode == 6:
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            gray = self._get_clahe(4.0).apply(gray)
+            image = cv2.bitwise_not(gray, dst=gray)
+        elif mode == 7:
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            _, image = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY, dst=gray)
+        return image
+
+    def get_processed_image(self, size=None):
+        """Return original_image with the active filters applied, cached per settings.
+
+        With a (width, height) size the image is downscaled to it first, so the
+        filters only process the pixels that will be shown.
+        """
+        key = (id(self.original_image), self.contrast_mode,
+               self.enhanced_mode_checkbox.isChecked(), self.trace_enhancement_active, size)
+        cached = self._processed_cache.get(key)
+        if cached is not None:
+            self._processed_cache.move_to_end(key)
+            return cached
+
+        # working_image is RGB, or BGRA when it comes straight from a screen grab.
+        # Nothing modifies the source in place, so it can be used directly.
+        working_image = self.original_image
+        scale = 1.0
+        if size is not None:
+            scale = size[0] / working_image.shape[1]
+            working_image = cv2.resize(working_image, size, interpolation=cv2.INTER_AREA)
+        if self._filters_active() and working_image.shape[2] == 4:
+            # BGRA -> RGB is just a reversed slice; OpenCV needs it contiguous
+            working_image = np.ascontiguousarray(working_image[..., 2::-1])
+
+        # All filter logic operates directly on the RGB image.
+        if self.enhanced_mode_checkbox.isChecked() and self.contrast_mode != 0:
+            working_image = self._compute_enhanced(
+                working_image, self.contrast_mode, (id(self.original_image), size))
 
         # Apply trace enhancement if enabled
         if self.trace_enhancement_active:
             # Enhance thin lines (like EEG traces)
-            gray = cv2.cvtColor(working_image, cv2.COLOR_BGR2GRAY)
-            kernel = np.ones((2,2), np.uint8)
-            dilated = cv2.dilate(gray, kernel, iterations=1)
-            working_image = cv2.cvtColor(dilated, cv2.COLOR_GRAY2BGR)
+            if working_image.ndim == 3:
+                working_image = cv2.cvtColor(working_image, cv2.COLOR_RGB2GRAY)
+            # The 2x2 kernel shrinks with the image so traces keep their look
+            kernel_size = max(1, round(2 * scale))
+            if kernel_size > 1:
+                kernel = np.ones((kernel_size, kernel_size), np.uint8)
+                working_image = cv2.dilate(working_image, kernel, iterations=1)
+
+        self._processed_cache[key] = working_image
+        if len(self._processed_cache) > PROCESSED_CACHE_SIZE:
+            self._processed_cache.popitem(last=False)
+        return working_image
+
+    def _image_to_pixmap(self, image):
+        """Convert an RGB, BGRA or single-channel gray image to a QPixmap."""
+        h, w = image.shape[:2]
+        if image.ndim == 2:
+            image_format = QImage.Format_Grayscale8
+        elif image.shape[2] == 4:
+            # BGRA is QImage's native 32-bit layout, so unfiltered screen grabs
+            # are shown without a conversion pass. RGB32 ignores the alpha byte,
+            # which mss leaves undefined on some platforms.
+            image_format = QImage.Format_RGB32
+        else:
+            # RGB is also what Format_RGB888 expects, so no conversion is needed
+            image_format = QImage.Format_RGB888
+        # The QImage only wraps this buffer, so it is kept alive on self rather
+        # than left to a local. fromImage then makes the pixmap's own copy, the
+        # one upload per processed image.
+        self._display_buf = np.ascontiguousarray(image)
+        qt_image = QImage(self._display_buf.data, w, h, self._display_buf.strides[0], image_format)
+        return QPixmap.fromImage(qt_image)
+
+    def schedule_update_zoom(self):
+        """Redraw within one frame, folding any further requests until then into it."""
+        if not self._zoom_timer.isActive():
+            self._zoom_timer.start()
 
-        width = int(working_image.shape[1] * scale_percent / 100)
-        height = int(working_image.shape[0] * scale_percent / 100)
-        resized = cv2.resize(working_image, (width, height), interpolation=cv2.INTER_LINEAR)
+    def update_zoom(self):
+        if self.original_image is None:
+            return
+        scale_percent = self.zoom_slider.value()
+        self.settings.setValue("last_zoom", scale_percent)
 
-        # The *only* conversion to RGB happens right here, for display.
-        display_image = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        # Re-render the PDF page once the zoom needs a different resolution
+        if self.doc is not None and self._pdf_dpi != pdf_dpi_for_zoom(scale_percent):
+            self.load_pdf_page(self.current_page_index, prefetch=False)
+            return
+
+        logical_width, logical_height = self._logical_size()
+        width = int(logical_width * scale_percent / 100)
+        height = int(logical_height * scale_percent / 100)
+
+        # Below source resolution, filter the downscaled image rather than
+        # filtering every source pixel and then throwing most of them away
+        size = None
+        if self._filters_active() and width < self.original_image.shape[1]:
+            size = (width, height)
+        working_image = self.get_processed_image(size)
+        if self._base_pixmap_source is not working_image:
+            self._base_pixmap = self._image_to_pixmap(working_image)
+            self._base_pixmap_source = working_image
+
+        if (width, height) == (working_image.shape[1], working_image.shape[0]):
+            final_pixmap = self._base_pixmap
+        else:
+            final_pixmap = self._base_pixmap.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
 
-        h, w, ch = display_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(display_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qt_image)
-        
-        # Create a new pixmap to draw overlays on
-        final_pixmap = QPixmap(pixmap.size())
-        final_pixmap.fill(Qt.transparent)
-        
-        # Draw the image
-        painter = QPainter(final_pixmap)
-        painter.drawPixmap(0, 0, pixmap)
-        
-        # Draw analysis overlays (use zoom_factor for positioning)
-        for overlay in self.analysis_overlays:
-            overlay.draw(painter, scale_percent / 100.0)
-        
-        # Draw currently being drawn overlay (preview)
-        if self.drawing_overlay:
-            self.drawing_overlay.draw(painter, scale_percent / 100.0)
-        
-        painter.end()
-        
         self.image_label.setPixmap(final_pixmap)
         self.image_label.adjustSize()
 
+        # The overlays are painted by their own layer, kept over the image
+        self._zoom_factor = scale_percent / 100.0
+        self.overlay_layer.zoom = self._zoom_factor
+        self.overlay_layer.resize(self.image_label.size())
+        self.update_overlays()
+
+    def update_overlays(self):
+        """Repaint the analysis overlays without touching the image."""
+        self.overlay_layer.preview_rect = None
+        self.overlay_layer.update()
+
     def apply_enhanced_mode(self):
         checked = self.enhanced_mode_checkbox.isChecked()
         self.settings.setValue("enhanced_mode", checked)
@@ -1371,9 +2552,9 @@ class ImageZoomViewer(QMainWindow):
             # When turning OFF, reset zoom to 100%
             self.zoom_percent = 100
         
-        # If not in live mode, force an update.
-        if not self.live_capture_active:
-            self.update_zoom()
+        # Live capture only sends changed frames, so a static screen would
+        # never show the new mode if this waited for the next one
+        self.update_zoom()
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_C:
@@ -1385,9 +2566,7 @@ class ImageZoomViewer(QMainWindow):
                 "Inverted Gray", "HC Gray", "Inv HC Gray", "Binary"
             ]
             self.contrast_label.setText(f"Contrast: {contrast_names[self.contrast_mode]}")
-            
-            if not self.live_capture_active:
-                self.update_zoom()
+            self.update_zoom()
 
         elif event.key() == Qt.Key_Plus or event.key() == Qt.Key_Equal:
             self.zoom_slider.setValue(self.zoom_slider.value() + 10)
@@ -1450,7 +2629,7 @@ class ImageZoomViewer(QMainWindow):
             if self.analysis_mode_active and self.drawing_overlay:
                 self.drawing_overlay = None
                 self.drawing_start_point = None
-                self.update_zoom()
+                self.update_overlays()
 
     def mouseMoveEvent(self, event):
         """Handle mouse move events for panning and analysis tools."""
@@ -1489,7 +2668,7 @@ class ImageZoomViewer(QMainWindow):
                 color = "#00FF00"  # Green for notes
                 note = NoteOverlay(pos, text, color)
                 self.analysis_overlays.append(note)
-                self.update_zoom()
+                self.update_overlays()
                 
         elif self.current_analysis_tool == "Ruler":
             # Let user pick a color for the ruler first
@@ -1520,7 +2699,7 @@ class ImageZoomViewer(QMainWindow):
                 self.drawing_overlay.end_point = pos
             elif isinstance(self.drawing_overlay, RegionOfInterestOverlay):
                 self.drawing_overlay.bottom_right = pos
-            self.update_zoom()
+            self.overlay_layer.update_preview(self.drawing_overlay)
 
     def handle_analysis_mouse_release(self, event):
         """Handle mouse release in analysis mode."""
@@ -1532,51 +2711,34 @@ class ImageZoomViewer(QMainWindow):
             if isinstance(self.drawing_overlay, RulerOverlay):
                 # Complete ruler
                 self.drawing_overlay.end_point = pos
-                
-                # Ask for a note
-                note, ok = QInputDialog.getText(self, "Ruler Note", "Enter a note for this ruler (optional):")
-                if ok and note:
-                    self.drawing_overlay.data['note'] = note
-                
                 self.analysis_overlays.append(self.drawing_overlay)
+                self._annotation_dock.prompt_for(self.drawing_overlay)
             elif isinstance(self.drawing_overlay, RegionOfInterestOverlay):
                 # Complete ROI box
                 self.drawing_overlay.bottom_right = pos
-                
-                # Ask for a note
-                note, ok = QInputDialog.getText(self, "ROI Note", "Enter a note for this region (optional):")
-                if ok and note:
-                    self.drawing_overlay.data['note'] = note
-                
                 self.analysis_overlays.append(self.drawing_overlay)
+                self._annotation_dock.prompt_for(self.drawing_overlay)
             
             self.drawing_overlay = None
             self.drawing_start_point = None
-            self.update_zoom()
+            self.update_overlays()
 
     def get_image_coordinates(self, mouse_pos):
-        """Convert mouse position to image coordinates."""
-        if not hasattr(self, 'image_label') or not self.image_label.pixmap():
+        """Convert mouse position to image coordinates.
+
+        Called on every mouse move, so it only reads the zoom the shown
+        pixmap was built at instead of querying the label and slider.
+        """
+        zoom_factor = self._zoom_factor
+        if self.original_image is None or zoom_factor is None:
             return None
-            
+
         # Get the image label's position relative to the scroll area
         label_pos = self.image_label.mapFrom(self.scroll_area.viewport(), mouse_pos)
-        
-        # Check if click is within the image
-        pixmap = self.image_label.pixmap()
-        if not pixmap:
-            return None
-            
+
         # Get the actual image dimensions (before zoom)
-        if self.original_image is not None:
-            original_width = self.original_image.shape[1]
-            original_height = self.original_image.shape[0]
-        else:
-            return None
-            
-        # Calculate zoom factor
-        zoom_factor = self.zoom_slider.value() / 100.0
-        
+        original_width, original_height = self._logical_size()
+
         # Convert from pixmap coordinates to original image coordinates
         image_x = int(label_pos.x() / zoom_factor)
         image_y = int(label_pos.y() / zoom_factor)
@@ -1592,61 +2754,35 @@ class ImageZoomViewer(QMainWindow):
         save_path, _ = QFileDialog.getSaveFileName(self, "Export View", "exported_view.png", "PNG Files (*.png)")
         if save_path:
             scale_percent = self.zoom_slider.value()
-            width = int(self.original_image.shape[1] * scale_percent / 100)
-            height = int(self.original_image.shape[0] * scale_percent / 100)
+            logical_width, logical_height = self._logical_size()
+            width = int(logical_width * scale_percent / 100)
+            height = int(logical_height * scale_percent / 100)
             
-            # The final processed image to be saved. It starts as BGR.
-            image_to_save = cv2.resize(self.original_image, (width, height), interpolation=cv2.INTER_LINEAR)
+            # The final processed image to be saved. It starts as RGB.
+            source = self.original_image
+            if source.shape[2] == 4:
+                source = np.ascontiguousarray(source[..., 2::-1])
+            # Filter whichever of the source or the output has fewer pixels:
+            # shrink (area averaging) before filtering, enlarge after it
+            shrinking = width < source.shape[1]
+            # With OpenCL, every step below runs on the device until the
+            # final download; all the OpenCV calls accept UMat as well
+            image_to_save = cv2.UMat(source) if OPENCL_AVAILABLE else source
+            if shrinking:
+                image_to_save = cv2.resize(image_to_save, (width, height), interpolation=cv2.INTER_AREA)
 
             if self.enhanced_mode_checkbox.isChecked() and self.contrast_mode != 0:
-                mode = self.contrast_mode
-                if mode == 1:
-                    lab = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2LAB)
-                    l, a, b = cv2.split(lab)
-                    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-                    l = clahe.apply(l)
-                    lab = cv2.merge([l, a, b])
-                    image_to_save = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-                    hsv = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2HSV)
-                    hsv[:, :, 1] = cv2.multiply(hsv[:, :, 1], 1.3)
-                    hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
-                    image_to_save = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-                elif mode == 2:
-                    lab = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2LAB)
-                    l, a, b = cv2.split(lab)
-                    clahe = cv2.createCLAHE(clipLimit=5.0, tileGridSize=(8,8))
-                    l = clahe.apply(l)
-                    a = cv2.multiply(a, 1.2)
-                    b = cv2.multiply(b, 1.2)
-                    a = np.clip(a, 0, 255)
-                    b = np.clip(b, 0, 255)
-                    lab = cv2.merge([l, a, b])
-                    image_to_save = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-                elif mode == 3:
-                    hsv = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2HSV)
-                    hsv[:, :, 2] = 255 - hsv[:, :, 2]
-                    image_to_save = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-                elif mode == 4:
-                    gray = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2GRAY)
-                    inverted = cv2.bitwise_not(gray)
-                    image_to_save = cv2.cvtColor(inverted, cv2.COLOR_GRAY2BGR)
-                elif mode == 5:
-                    gray = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2GRAY)
-                    clahe = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(8,8))
-                    enhanced_gray = clahe.apply(gray)
-                    image_to_save = cv2.cvtColor(enhanced_gray, cv2.COLOR_GRAY2BGR)
-                elif mode == 6:
-                    gray = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2GRAY)
-                    clahe = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(8,8))
-                    enhanced_gray = clahe.apply(gray)
-                    inverted = cv2.bitwise_not(enhanced_gray)
-                    image_to_save = cv2.cvtColor(inverted, cv2.COLOR_GRAY2BGR)
-                elif mode == 7:
-                    gray = cv2.cvtColor(image_to_save, cv2.COLOR_BGR2GRAY)
-                    _, thresh = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY)
-                    image_to_save = cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
-            
-            # cv2.imwrite expects BGR, which our image is already in.
+                image_to_save = self._compute_enhanced(image_to_save, self.contrast_mode)
+
+            if not shrinking and (width, height) != (source.shape[1], source.shape[0]):
+                image_to_save = cv2.resize(image_to_save, (width, height), interpolation=cv2.INTER_LINEAR)
+
+            if isinstance(image_to_save, cv2.UMat):
+                image_to_save = image_to_save.get()
+            # cv2.imwrite expects BGR; this is the only conversion back to it.
+            # The gray modes are written as single-channel images.
+            if image_to_save.ndim == 3:
+                image_to_save = cv2.cvtColor(image_to_save, cv2.COLOR_RGB2BGR)
             cv2.imwrite(save_path, image_to_save)
 
     def restore_session(self):
@@ -1672,14 +2808,13 @@ class ImageZoomViewer(QMainWindow):
         if last_file and os.path.exists(last_file):
             self.current_file_path = last_file
             if last_file.lower().endswith('.pdf'):
-                self.doc = fitz.open(last_file)
-                self.page_selector.setMaximum(len(self.doc))
+                self._set_pdf(*open_pdf(last_file))
+                self.page_selector.setMaximum(self._pdf_page_count)
                 self.current_page_index = 0
                 self.load_pdf_page(self.current_page_index)
             else:
-                self.doc = None
-                self.original_image = cv2.imread(last_file)
-                self.current_image = self.original_image.copy()
+                self._set_pdf(None)
+                self._set_original_image(_read_image_rgb(last_file))
                 self.page_selector.setMaximum(1)
                 self.update_zoom()
 
@@ -1687,17 +2822,40 @@ class ImageZoomViewer(QMainWindow):
         saved_positions_json = self.settings.value("saved_positions", "")
         if saved_positions_json:
             try:
-                self.saved_positions = json.loads(saved_positions_json)
+                self.saved_positions = _json_loads(saved_positions_json)
                 self.update_positions_list()
             except json.JSONDecodeError:
                 self.saved_positions = {}
 
+        # Saved annotations and overlays are rebuilt once the window is up
+        self._annotations_pending = True
+        QTimer.singleShot(0, self._rebuild_annotations)
+
+        # Load analysis mode state
+        self.analysis_mode_active = self.settings.value("analysis_mode_active", False, type=bool)
+        self.current_analysis_tool = self.settings.value("current_analysis_tool", "Note", type=str)
+
+        # Update analysis tool combo
+        self.analysis_tool_combo.clear()
+        self.analysis_tool_combo.addItems(["Note", "Ruler", "ROI"])
+        self.analysis_tool_combo.setCurrentText(self.current_analysis_tool)
+        self.analysis_tool_combo.setEnabled(self.analysis_mode_active)
+        
+        # Update analysis mode button state to match loaded settings
+        self.analysis_mode_button.setChecked(self.analysis_mode_active)
+
+    def _rebuild_annotations(self):
+        """Load the saved annotations and overlays; runs once, after restore_session."""
+        if not self._annotations_pending:
+            return
+        self._annotations_pending = False
+
         # Load saved annotations
         saved_annotations_json = self.settings.value("saved_annotations", "")
         if saved_annotations_json:
             try:
-                annotations_data = json.loads(saved_annotations_json)
-                self.professional_annotations = []
+                annotations_data = _json_loads(saved_annotations_json)
+                self.professional_annotations = AnnotationStore()
                 for ann_data in annotations_data:
                     position = None
                     if "position" in ann_data:
@@ -1707,34 +2865,22 @@ class ImageZoomViewer(QMainWindow):
                     annotation.id = ann_data.get("id", annotation.id)
                     self.professional_annotations.append(annotation)
             except json.JSONDecodeError:
-                self.professional_annotations = []
+                self.professional_annotations = AnnotationStore()
 
         # Load analysis overlays
         overlays_data = self.settings.value("analysis_overlays", [])
-        self.analysis_overlays = []
+        self.analysis_overlays = OverlayStore()
         for overlay_data in overlays_data:
             overlay = AnalysisOverlay.from_dict(overlay_data)
-            self.analysis_overlays.append(overlay)
-
-        # Load analysis mode state
-        self.analysis_mode_active = self.settings.value("analysis_mode_active", False, type=bool)
-        self.current_analysis_tool = self.settings.value("current_analysis_tool", "Note", type=str)
-
-        # Update analysis tool combo
-        self.analysis_tool_combo.clear()
-        self.analysis_tool_combo.addItems(["Note", "Ruler", "ROI"])
-        self.analysis_tool_combo.setCurrentText(self.current_analysis_tool)
-        self.analysis_tool_combo.setEnabled(self.analysis_mode_active)
-        
-        # Update analysis mode button state to match loaded settings
-        self.analysis_mode_button.setChecked(self.analysis_mode_active)
+            if overlay is not None:
+                self.analysis_overlays.append(overlay)
+        self.update_overlays()
 
     # EEG Viewing Aid Functions
     def toggle_trace_enhancement(self):
         """Toggle EEG trace enhancement mode."""
         self.trace_enhancement_active = self.trace_enhance_button.isChecked()
-        if not self.live_capture_active:
-            self.update_zoom()
+        self.update_zoom()
 
     def toggle_analysis_mode(self):
         """Toggle analysis mode."""
@@ -1803,6 +2949,8 @@ class ImageZoomViewer(QMainWindow):
         """Show the analysis overlays management panel."""
         dialog = QDialog(self)
         dialog.setWindowTitle("Analysis Overlays Manager")
+        # Styled by the overlay_manager rules in _APP_QSS
+        dialog.setObjectName("overlay_manager")
         dialog.setModal(True)
         dialog.resize(600, 400)
         
@@ -1841,9 +2989,7 @@ class ImageZoomViewer(QMainWindow):
                 if overlay.type == "Note":
                     details = overlay.text
                 elif overlay.type == "Ruler":
-                    distance = math.sqrt((overlay.end_point.x() - overlay.start_point.x())**2 + 
-                                       (overlay.end_point.y() - overlay.start_point.y())**2)
-                    details = f"Distance: {distance:.1f}px"
+                    details = f"Distance: {overlay.distance:.1f}px"
                     if 'note' in overlay.data and overlay.data['note']:
                         details += f" - {overlay.data['note']}"
                 elif overlay.type == "ROI":
@@ -1896,16 +3042,13 @@ class ImageZoomViewer(QMainWindow):
         
         dialog.setLayout(layout)
         
-        # Apply dark theme
-        dialog.setStyleSheet(self.get_dark_theme_stylesheet())
-        
         dialog.exec_()
 
     def delete_overlay(self, index, refresh_callback):
         """Delete an overlay and refresh the calling table."""
         if 0 <= index < len(self.analysis_overlays):
             del self.analysis_overlays[index]
-            self.update_zoom() # Redraw the main view
+            self.update_overlays() # Redraw the main view
             refresh_callback() # Refresh the table in the dialog
 
     def edit_overlay(self, index, refresh_callback):
@@ -1916,7 +3059,7 @@ class ImageZoomViewer(QMainWindow):
                 text, ok = QInputDialog.getText(self, "Edit Note", "Enter new text:", text=overlay.text)
                 if ok:
                     overlay.text = text
-                    self.update_zoom()
+                    self.update_overlays()
                     refresh_callback()
             elif overlay.type == "ROI":
                 current_note = overlay.data.get('note', '')
@@ -1926,14 +3069,16 @@ class ImageZoomViewer(QMainWindow):
                         overlay.data['note'] = note
                     else:
                         overlay.data.pop('note', None)
-                    self.update_zoom()
+                    overlay.invalidate()
+                    self.update_overlays()
                     refresh_callback()
             elif overlay.type == "Ruler":
                 current_note = overlay.data.get('note', '')
                 text, ok = QInputDialog.getText(self, 'Edit Ruler Note', 'Note:', QLineEdit.Normal, current_note)
                 if ok:
                     overlay.data['note'] = text
-                    self.update_zoom()
+                    overlay.invalidate()
+                    self.update_overlays()
                     refresh_callback()
             # Add more edit options for other overlay types as needed
 
@@ -1944,18 +3089,15 @@ class ImageZoomViewer(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
             self.analysis_overlays.clear()
-            self.update_zoom()
+            self.update_overlays()
 
     def export_overlays(self):
         """Export overlays to a file."""
         filename, _ = QFileDialog.getSaveFileName(self, "Export Overlays", "", "JSON Files (*.json)")
         if filename:
-            overlays_data = []
-            for overlay in self.analysis_overlays:
-                overlays_data.append(overlay.to_dict())
-            
-            with open(filename, 'w') as f:
-                json.dump(overlays_data, f, indent=2)
+            overlays_data = [overlay.to_dict() for overlay in self.analysis_overlays]
+            with open(filename, 'wb') as f:
+                f.write(_json_dumps(overlays_data))
             
             QMessageBox.information(self, "Export Complete", f"Overlays exported to {filename}")
 
@@ -1970,7 +3112,7 @@ class ImageZoomViewer(QMainWindow):
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             self.saved_positions[name] = position_data
-            self.settings.setValue("saved_positions", json.dumps(self.saved_positions))
+            self.settings.setValue("saved_positions", _json_dumps(self.saved_positions, indent=False).decode('utf-8'))
             self.update_positions_list()
             QMessageBox.information(self, "Position Saved", f"Position '{name}' saved successfully!")
 
@@ -1991,32 +3133,25 @@ class ImageZoomViewer(QMainWindow):
 
     def closeEvent(self, event):
         """Save annotations when closing the application."""
+        # The capture thread must not outlive the window
+        if self.capture_thread:
+            self.stop_live_capture()
+        close_sct()
+        self._set_pdf(None)
+        self._pdf_pool.waitForDone()
+        # Closing before the saved data was loaded must not overwrite it
+        self._rebuild_annotations()
+
         # Save analysis overlays
-        overlays_data = []
-        for overlay in self.analysis_overlays:
-            overlays_data.append(overlay.to_dict())
-        self.settings.setValue('analysis_overlays', overlays_data)
+        self.settings.setValue('analysis_overlays', [overlay.to_dict() for overlay in self.analysis_overlays])
         
         # Save analysis mode state
         self.settings.setValue('analysis_mode_active', self.analysis_mode_active)
         self.settings.setValue('current_analysis_tool', self.current_analysis_tool)
 
         # Save professional annotations
-        annotations_data = []
-        for annotation in self.professional_annotations:
-            ann_data = {
-                "type": annotation.type,
-                "id": annotation.id,
-                "data": annotation.data
-            }
-            if annotation.position:
-                ann_data["position"] = {
-                    "x": annotation.position.x(),
-                    "y": annotation.position.y()
-                }
-            annotations_data.append(ann_data)
-        
-        self.settings.setValue("saved_annotations", json.dumps(annotations_data))
+        annotations_data = [annotation.to_dict() for annotation in self.professional_annotations]
+        self.settings.setValue("saved_annotations", _json_dumps(annotations_data, indent=False).decode('utf-8'))
         event.accept()
 
     def map_event_to_image_coords(self, event):
@@ -2030,9 +3165,10 @@ class ImageZoomViewer(QMainWindow):
         
         return QPoint(final_x, final_y)
 
-    def calculate_distance(self, point1, point2):
+    @staticmethod
+    def calculate_distance(point1, point2):
         """Calculate distance between two points in pixels."""
-        return ((point2.x() - point1.x())**2 + (point2.y() - point1.y())**2)**0.5
+        return math.hypot(point2.x() - point1.x(), point2.y() - point1.y())
 
     def draw_measurements(self, painter):
         """Draw measurement lines and current measurement in progress."""
@@ -2074,205 +3210,85 @@ class ImageZoomViewer(QMainWindow):
         else:
             self.static_ruler.hide()
 
-    def get_dark_theme_stylesheet(self):
-        return """
-        QWidget {
-            background-color: #2e2e2e;
-            color: #ffffff;
-            border: none;
-        }
-        QMainWindow {
-            background-color: #2e2e2e;
-        }
-        QPushButton {
-            background-color: #555555;
-            border: 1px solid #666666;
-            padding: 5px;
-            border-radius: 2px;
-        }
-        QPushButton:hover {
-            background-color: #666666;
-        }
-        QPushButton:checked {
-            background-color: #4CAF50;
-        }
-        QSlider::groove:horizontal {
-            background: #444444;
-            height: 8px;
-            border-radius: 4px;
-        }
-        QSlider::handle:horizontal {
-            background: #888888;
-            border: 1px solid #999999;
-            width: 14px;
-            margin: -4px 0;
-            border-radius: 7px;
-        }
-        QLabel, QCheckBox, QSpinBox, QComboBox {
-            background-color: transparent;
-        }
-        QSpinBox, QComboBox {
-            border: 1px solid #555;
-            padding: 2px;
-        }
-        QDialog {
-            background-color: #2e2e2e;
-        }
-        QTableWidget {
-            background-color: #3e3e3e;
-            gridline-color: #555555;
-        }
-        QTableWidget::item {
-            padding: 5px;
-        }
-        QTableWidget::item:selected {
-            background-color: #4CAF50;
-        }
-        QHeaderView::section {
-            background-color: #555555;
-            padding: 5px;
-            border: 1px solid #666666;
-        }
-        """
-
     def toggle_measurement_grid(self):
+        if not self.measurement_grid:
+            # Nothing to hide yet. Building it the first time waits for the
+            # event loop, so the button click returns at once.
+            if self.measurement_grid_button.isChecked():
+                QTimer.singleShot(0, self._build_grid)
+            return
+        self._apply_grid_visibility()
+
+    def _build_grid(self):
+        """Create the grid on first use, then match it to the button."""
         if not self.measurement_grid:
             self.measurement_grid = MeasurementGridWidget()
             self.load_grid_calibration() # Load saved settings
-        
-        if self.measurement_grid_button.isChecked():
+        self._apply_grid_visibility()
+
+    def _apply_grid_visibility(self):
+        want = self.measurement_grid_button.isChecked()
+        # Already in the requested state
+        if want == self.measurement_grid.isVisible():
+            return
+        if want:
             self.measurement_grid.show()
         else:
             self.measurement_grid.hide()
 
+    def get_grid_calibration(self):
+        """Return the grid Calibration, reading settings only the first time."""
+        if self._calibration is None:
+            settings = self.settings
+            # Calibrations saved before the group existed used cal_-prefixed keys
+            if settings.contains("cal_x_px"):
+                legacy = Calibration.from_settings(settings, prefix="cal_")
+                for field in fields(Calibration):
+                    settings.remove("cal_" + field.name)
+                self._save_grid_calibration(legacy)
+            settings.beginGroup("calibration")
+            self._calibration = Calibration.from_settings(settings)
+            settings.endGroup()
+        return self._calibration
+
+    def _save_grid_calibration(self, calibration):
+        settings = self.settings
+        settings.beginGroup("calibration")
+        calibration.save(settings)
+        settings.endGroup()
+        settings.sync()
+        self._calibration = calibration
+
     def calibrate_grid(self):
         # Create dialog with current values
-        x_px = self.settings.value("cal_x_px", 50, type=int)
-        x_val = self.settings.value("cal_x_val", 100, type=float)
-        x_unit = self.settings.value("cal_x_unit", "ms", type=str)
-        y_px = self.settings.value("cal_y_px", 50, type=int)
-        y_val = self.settings.value("cal_y_val", 50, type=float)
-        y_unit = self.settings.value("cal_y_unit", "µV", type=str)
-
-        dialog = CalibrationDialog(self, x_px, x_val, x_unit, y_px, y_val, y_unit)
+        cal = self.get_grid_calibration()
+        dialog = CalibrationDialog(self, cal.x_px, cal.x_val, cal.x_unit,
+                                   cal.y_px, cal.y_val, cal.y_unit)
         if dialog.exec_():
-            values = dialog.get_values()
-            # Save values
-            self.settings.setValue("cal_x_px", values["x_px"])
-            self.settings.setValue("cal_x_val", values["x_val"])
-            self.settings.setValue("cal_x_unit", values["x_unit"])
-            self.settings.setValue("cal_y_px", values["y_px"])
-            self.settings.setValue("cal_y_val", values["y_val"])
-            self.settings.setValue("cal_y_unit", values["y_unit"])
-            
+            self._save_grid_calibration(Calibration(**dialog.get_values()))
+
             # Apply to grid if it exists
             if self.measurement_grid:
                 self.load_grid_calibration()
 
     def load_grid_calibration(self):
         if self.measurement_grid:
-            self.measurement_grid.x_pixels_per_unit = self.settings.value("cal_x_px", 50, type=int)
-            x_val = self.settings.value("cal_x_val", 100, type=float)
-            self.measurement_grid.x_unit_name = self.settings.value("cal_x_unit", "ms", type=str)
-            self.measurement_grid.x_val_per_tick = x_val
-            
-            self.measurement_grid.y_pixels_per_unit = self.settings.value("cal_y_px", 50, type=int)
-            y_val = self.settings.value("cal_y_val", 50, type=float)
-            self.measurement_grid.y_unit_name = self.settings.value("cal_y_unit", "µV", type=str)
-            self.measurement_grid.y_val_per_tick = y_val
-            
-            self.measurement_grid.update() # Repaint with new calibration
+            self.measurement_grid.update_calibration(self.get_grid_calibration())
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    app.setStyleSheet("""
-        QWidget {
-            background-color: #2e2e2e;
-            color: #ffffff;
-            border: none;
-        }
-        QMainWindow, QDialog {
-            background-color: #3c3c3c;
-            border: 1px solid #555;
-        }
-        QPushButton {
-            background-color: #555555;
-            border: 1px solid #666666;
-            padding: 5px;
-            border-radius: 2px;
-        }
-        QPushButton:hover {
-            background-color: #666666;
-        }
-        QPushButton:pressed {
-            background-color: #4d4d4d;
-        }
-        QSlider::groove:horizontal {
-            background: #444444;
-            height: 8px;
-            border-radius: 4px;
-        }
-        QSlider::handle:horizontal {
-            background: #888888;
-            border: 1px solid #999999;
-            width: 14px;
-            margin: -4px 0;
-            border-radius: 7px;
-        }
-        QLabel, QCheckBox, QRadioButton {
-            background-color: transparent;
-        }
-        QSpinBox, QLineEdit, QTextEdit, QComboBox {
-            border: 1px solid #555;
-            padding: 3px;
-            background-color: #2e2e2e;
-            color: #fff;
-            border-radius: 2px;
-        }
-        QComboBox::drop-down {
-            border-left: 1px solid #555;
-        }
-        QTableWidget {
-            gridline-color: #555;
-            background-color: #2e2e2e;
-            color: #fff;
-        }
-        QHeaderView::section {
-            background-color: #444;
-            padding: 4px;
-            border: 1px solid #555;
-            color: #fff;
-        }
-        QTabWidget::pane {
-            border: 1px solid #555;
-            border-top: none;
-        }
-        QTabBar::tab {
-            background: #444;
-            border: 1px solid #555;
-            border-bottom: none;
-            padding: 8px 20px;
-            border-top-left-radius: 4px;
-            border-top-right-radius: 4px;
-            color: #fff;
-            margin-right: 2px;
-        }
-        QTabBar::tab:selected {
-            background: #3c3c3c;
-            margin-bottom: -1px;
-        }
-        QStatusBar {
-            background: #2e2e2e;
-        }
-    """)
+    app.setStyleSheet(_APP_QSS)
     viewer = ImageZoomViewer()
     viewer.show()
 
-    # Close the splash screen
-    try:
-        import pyi_splash
-        pyi_splash.close()
-    except ImportError:
-        pass  # This will fail when not running from a bundled app, which is fine.
+    # Close the splash screen once the event loop has painted the window,
+    # so there is no blank gap between the two. Only PyInstaller builds
+    # (sys.frozen) have one, so the import isn't even tried otherwise.
+    if getattr(sys, "frozen", False):
+        try:
+            import pyi_splash
+            QTimer.singleShot(0, pyi_splash.close)
+        except ImportError:
+            pass  # Frozen without a splash screen configured
 
     sys.exit(app.exec_()) 
\ No newline at end of file